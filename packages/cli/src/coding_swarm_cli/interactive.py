@@ -42,6 +42,7 @@ from rich.layout import Layout
 from rich.padding import Padding
 
 from coding_swarm_core.projects import ProjectRegistry, Project, FileIndexEntry
+from coding_swarm_core.premium import FuzzyMatcher as ProjectMatcher
 from coding_swarm_agents.tools import FileReader
 from coding_swarm_agents.diagnostics import auto_debug, summarize_fail_report
 
@@ -459,14 +460,18 @@ class PremiumSanaa:
         
         project_names = [p.name for p in projects]
         
-        # If hint provided, try fuzzy matching
+        # If hint provided, try prefix completion, then fuzzy matching
         if hint:
+            completions = registry.name_index().complete(hint)
+            if len(completions) == 1:
+                return registry.get(completions[0])
+            
             match = self.fuzzy.find_best_match(hint, project_names)
             if match:
                 return registry.get(match)
             
             # Show suggestions
-            suggestions = self.fuzzy.suggest_corrections(hint, project_names)
+            suggestions = ProjectMatcher.suggest_projects(hint, registry)
             if suggestions:
                 self.console.print(f"[yellow]Project '{hint}' not found. Did you mean:[/yellow]")
                 for suggestion, score in suggestions:
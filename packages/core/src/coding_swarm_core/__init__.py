@@ -3,7 +3,7 @@
 from .projects import ProjectRegistry, Project, FileIndexEntry
 from .premium import PremiumSanaa, SanaaConfig, FuzzyMatcher, SmartProgress, SmartInteractiveMode
 from .project_manager import PremiumProjectManager, enhanced_projects
-from .project_templates import ProjectTemplateManager, template_manager
+from .project_templates import ProjectTemplateManager, template_manager, get_template_manager
 from .context_awareness import SmartContextAnalyzer, context_analyzer
 from .system_monitor import SystemMonitor, system_monitor
 from .security import SecurityManager, get_security_manager
@@ -25,7 +25,7 @@ __all__ = [
     "ProjectRegistry", "Project", "FileIndexEntry",
     "PremiumSanaa", "SanaaConfig", "FuzzyMatcher", "SmartProgress", "SmartInteractiveMode",
     "PremiumProjectManager", "enhanced_projects",
-    "ProjectTemplateManager", "template_manager",
+    "ProjectTemplateManager", "template_manager", "get_template_manager",
     "SmartContextAnalyzer", "context_analyzer",
     "SystemMonitor", "system_monitor",
     "SecurityManager", "get_security_manager",
@@ -40,7 +40,7 @@ __all__ = [
     "ProjectRegistry", "Project", "FileIndexEntry",
     "PremiumSanaa", "SanaaConfig", "FuzzyMatcher", "SmartProgress", "SmartInteractiveMode",
     "PremiumProjectManager", "enhanced_projects",
-    "ProjectTemplateManager", "template_manager",
+    "ProjectTemplateManager", "template_manager", "get_template_manager",
     "SmartContextAnalyzer", "context_analyzer",
     "SystemMonitor", "system_monitor"
 ]
@@ -1,13 +1,36 @@
 # packages/core/src/coding_swarm_core/enhanced_modes.py
 """Enhanced Multi-Mode System similar to KiloCode's modes with custom mode support"""
 
+import asyncio
 import json
+import mmap
+import os
+import re
+import sys
 import yaml
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Union, Callable, Iterable, Iterator, FrozenSet, Mapping, Tuple, Final
 from pathlib import Path
-from dataclasses import dataclass, field
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field, fields
 from abc import ABC, abstractmethod
 from enum import Enum
+from functools import lru_cache, partial
+
+try:
+    import ahocorasick  # pyahocorasick C extension
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # libyaml C bindings are ~10x faster than the pure-Python loader
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 class ToolPermission(Enum):
     READ = "read"
@@ -16,56 +39,217 @@ class ToolPermission(Enum):
     BROWSE = "browse"
     MCP = "mcp"
 
-@dataclass
+# Condition count from which a per-config automaton beats a linear scan
+_SWITCH_AUTOMATON_MIN = 8
+
+@dataclass(slots=True)
 class ModeConfig:
     """Configuration for a mode similar to KiloCode's custom modes"""
     name: str
     description: str
     system_prompt: str
-    tool_permissions: List[ToolPermission] = field(default_factory=list)
-    file_permissions: Dict[str, List[str]] = field(default_factory=dict)  # pattern -> permissions
-    auto_switch_conditions: List[str] = field(default_factory=list)
+    tool_permissions: Tuple[ToolPermission, ...] = field(default_factory=tuple)
+    file_permissions: Mapping[str, Tuple[str, ...]] = field(default_factory=dict)  # pattern -> permissions
+    auto_switch_conditions: Tuple[str, ...] = field(default_factory=tuple)
     context_size_limit: Optional[int] = None
     model_preference: Optional[str] = None
     temperature: float = 0.7
     max_iterations: int = 10
     requires_approval: bool = True
+    # Parsed auto_switch_conditions, built once in __post_init__
+    _switch_table: Tuple[Tuple[str, str], ...] = field(
+        default=(), init=False, repr=False, compare=False
+    )
+    _switch_automaton: Any = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Prompts repeat verbatim across handlers and example modes
+        self.system_prompt = sys.intern(self.system_prompt)
+        # Permissions loaded from YAML/JSON arrive as their string values
+        self.tool_permissions = tuple(ToolPermission(p) for p in self.tool_permissions)
+        self.file_permissions = {
+            pattern: tuple(perms) for pattern, perms in self.file_permissions.items()
+        }
+        self.auto_switch_conditions = tuple(self.auto_switch_conditions)
+        self._compile_switch_table()
+    
+    def _compile_switch_table(self):
+        """Parse "trigger->target" conditions into (trigger, target) pairs"""
+        table = []
+        for condition in self.auto_switch_conditions:
+            trigger, sep, target = condition.partition("->")
+            trigger, target = trigger.strip().lower(), target.strip()
+            if sep and trigger and target:
+                table.append((trigger, target))
+        self._switch_table = tuple(table)
+        
+        self._switch_automaton = None
+        if ahocorasick is not None and len(table) >= _SWITCH_AUTOMATON_MIN:
+            automaton = ahocorasick.Automaton()
+            for index, (trigger, _) in enumerate(table):
+                if trigger not in automaton:  # First condition wins on duplicates
+                    automaton.add_word(trigger, index)
+            automaton.make_automaton()
+            self._switch_automaton = automaton
+    
+    def switch_target(self, request_lower: str) -> Optional[str]:
+        """Target of the first auto-switch condition triggered by the request"""
+        if self._switch_automaton is not None:
+            hits = [index for _, index in self._switch_automaton.iter(request_lower)]
+            return self._switch_table[min(hits)][1] if hits else None
+        for trigger, target in self._switch_table:
+            if trigger in request_lower:
+                return target
+        return None
+
+def _mode_config_to_dict(config: ModeConfig) -> Dict[str, Any]:
+    """Plain-data view of a ModeConfig for YAML/JSON persistence"""
+    data = {f.name: getattr(config, f.name) for f in fields(config) if f.init}
+    data["tool_permissions"] = [p.value for p in config.tool_permissions]
+    data["file_permissions"] = {
+        pattern: list(perms) for pattern, perms in config.file_permissions.items()
+    }
+    data["auto_switch_conditions"] = list(config.auto_switch_conditions)
+    return data
+
+def _fmt(data: Any) -> str:
+    """Indented JSON for prompts, via orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+_WORD_RE = re.compile(r"[a-z0-9_]+(?:-[a-z0-9_]+)*")
+
+@lru_cache(maxsize=256)
+def _tokenize(request_lower: str) -> FrozenSet[str]:
+    """Words and adjacent word pairs of a lowercased request (cached)
+
+    Pairs let two-word keywords such as "not working" match by lookup.
+    """
+    words = _WORD_RE.findall(request_lower)
+    return frozenset(words).union(" ".join(pair) for pair in zip(words, words[1:]))
+
+# Top-level marker files -> technology they indicate
+_TECH_MARKERS = {
+    "package.json": "Node.js",
+    "requirements.txt": "Python",
+    "pyproject.toml": "Python",
+    "Dockerfile": "Docker",
+    "Cargo.toml": "Rust",
+    "go.mod": "Go",
+}
+
+# Vendored/build directories that say nothing about project structure
+_PRUNE_DIRS = frozenset({
+    ".git", "node_modules", "__pycache__", "venv", ".venv",
+    "dist", "build", "target",
+})
+
+# File count after which project analysis stops walking and reports a sample
+_MAX_WALK_ENTRIES = 20_000
+
+class _WalkLimitReached(Exception):
+    """Raised by _scandir_files when more than max_entries files exist"""
+
+def _scandir_files(root: Path, max_entries: int = _MAX_WALK_ENTRIES) -> Iterator[os.DirEntry]:
+    """Yield file entries under ``root`` using os.scandir
+
+    DirEntry caches its type from the directory listing, so this avoids the
+    extra stat() per entry that ``Path.rglob`` + ``is_file()`` costs.
+    Symlinked and vendored directories are not descended into, and
+    directories that cannot be listed, ``root`` included, yield nothing.
+    Raises _WalkLimitReached instead of yielding file number
+    ``max_entries + 1``.
+    """
+    yielded = 0
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _PRUNE_DIRS:
+                    pending.append(entry.path)
+            elif entry.is_file():
+                if yielded >= max_entries:
+                    raise _WalkLimitReached
+                yielded += 1
+                yield entry
 
 class BaseModeHandler(ABC):
     """Base class for mode handlers"""
     
+    __slots__ = ("config", "mcp_client")
+    
+    CLASS_KEYWORDS: FrozenSet[str] = frozenset()
+    
     def __init__(self, config: ModeConfig, mcp_client=None):
-        self.config = config
+        self.config: Final[ModeConfig] = config
         self.mcp_client = mcp_client
-        self.conversation_history = []
     
     @abstractmethod
     async def process_request(self, request: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Process a request in this mode"""
         pass
     
-    @abstractmethod
     def can_handle_request(self, request: str, context: Dict[str, Any]) -> bool:
-        """Check if this mode can handle the request"""
-        pass
+        """Check if this mode can handle the request
+
+        Uses the same whole-word token lookup as CustomModeManager.suggest_mode,
+        so "plan" does not fire on "planet".
+        """
+        return self.matches_tokens(_tokenize(request.lower()))
+    
+    @property
+    def keywords(self) -> FrozenSet[str]:
+        """Lowercase keywords that route a request to this mode"""
+        return self.CLASS_KEYWORDS
+    
+    def matches_tokens(self, tokens: FrozenSet[str]) -> bool:
+        """Check an already tokenized request against this mode's keywords"""
+        return not self.keywords.isdisjoint(tokens)
     
     def should_switch_mode(self, request: str, context: Dict[str, Any]) -> Optional[str]:
         """Check if should switch to another mode"""
-        for condition in self.config.auto_switch_conditions:
-            # Simple keyword-based switching (can be enhanced with ML)
-            if condition.lower() in request.lower():
-                # Extract target mode from condition
-                if "->architect" in condition:
-                    return "architect"
-                elif "->coder" in condition:
-                    return "coder"  
-                elif "->debugger" in condition:
-                    return "debugger"
-        return None
+        # Simple keyword-based switching (can be enhanced with ML)
+        return self.config.switch_target(request.lower())
 
 class ArchitectMode(BaseModeHandler):
     """Architect mode for planning and design"""
     
+    __slots__ = ("_proj_cache",)
+
+    CLASS_KEYWORDS: FrozenSet[str] = frozenset({
+        "design", "architecture", "plan", "structure", "organize",
+        "strategy", "approach", "system", "high-level", "overview"
+    })
+
+    _PROJ_CACHE_SIZE = 8
+    
+    _PLAN_INSTRUCTIONS = """
+Please provide a detailed architectural plan including:
+1. System overview and key components
+2. Implementation phases with milestones
+3. Technical decisions and rationale
+4. Acceptance criteria for each phase
+5. Risk assessment and mitigation strategies
+"""
+    # %-templates joined once at class creation; only the variable parts
+    # are substituted per request
+    _PROMPT_WITH_CTX = """
+Project Context: %s
+
+Request: %s
+""" + _PLAN_INSTRUCTIONS
+    # No project path: skip the empty "Project Context: {}" preamble
+    _PROMPT_NO_CTX = """
+Request: %s
+""" + _PLAN_INSTRUCTIONS
+    
     def __init__(self, mcp_client=None):
         config = ModeConfig(
             name="architect",
@@ -93,24 +277,18 @@ Always provide structured plans with clear acceptance criteria.""",
             ]
         )
         super().__init__(config, mcp_client)
+        # (project_path, root mtime_ns) -> (analysis, prompt JSON), bounded LRU
+        self._proj_cache: "OrderedDict[tuple[str, int], Tuple[Dict[str, Any], str]]" = OrderedDict()
     
     async def process_request(self, request: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Process architect request"""
         # Enhanced with project analysis
-        project_context = await self._analyze_project_structure(context.get("project_path"))
+        project_context, context_json = await self._project_snapshot(context.get("project_path"))
         
-        enhanced_prompt = f"""
-Project Context: {json.dumps(project_context, indent=2)}
-
-Request: {request}
-
-Please provide a detailed architectural plan including:
-1. System overview and key components
-2. Implementation phases with milestones
-3. Technical decisions and rationale
-4. Acceptance criteria for each phase
-5. Risk assessment and mitigation strategies
-"""
+        if project_context:
+            enhanced_prompt = self._PROMPT_WITH_CTX % (context_json, request)
+        else:
+            enhanced_prompt = self._PROMPT_NO_CTX % (request,)
         
         # Your LLM call here with enhanced context
         response = await self._call_llm(enhanced_prompt, context)
@@ -122,19 +300,38 @@ Please provide a detailed architectural plan including:
             "suggested_next_mode": self._suggest_next_mode(response)
         }
     
-    def can_handle_request(self, request: str, context: Dict[str, Any]) -> bool:
-        architect_keywords = [
-            "design", "architecture", "plan", "structure", "organize",
-            "strategy", "approach", "system", "high-level", "overview"
-        ]
-        return any(keyword in request.lower() for keyword in architect_keywords)
-    
     async def _analyze_project_structure(self, project_path: str) -> Dict[str, Any]:
         """Analyze project structure for architectural context"""
+        analysis, _ = await self._project_snapshot(project_path)
+        return analysis
+    
+    async def _project_snapshot(self, project_path: str) -> Tuple[Dict[str, Any], str]:
+        """Project analysis plus its serialized form, cached by root mtime"""
         if not project_path:
-            return {}
+            return {}, "{}"
+        
+        try:
+            mtime = os.stat(project_path).st_mtime_ns
+        except OSError:
+            return {}, "{}"
+        
+        key = (str(project_path), mtime)
+        cached = self._proj_cache.get(key)
+        if cached is not None:
+            self._proj_cache.move_to_end(key)
+            return cached
+        
+        analysis = self._scan_project(Path(project_path))
+        snapshot = (analysis, _fmt(analysis))
+        
+        self._proj_cache[key] = snapshot
+        if len(self._proj_cache) > self._PROJ_CACHE_SIZE:
+            self._proj_cache.popitem(last=False)
         
-        path = Path(project_path)
+        return snapshot
+    
+    def _scan_project(self, path: Path) -> Dict[str, Any]:
+        """Walk the project once and summarize its layout"""
         analysis = {
             "structure": {},
             "technologies": [],
@@ -144,20 +341,24 @@ Please provide a detailed architectural plan including:
         }
         
         # Analyze structure
-        for item in path.rglob("*"):
-            if item.is_file():
-                ext = item.suffix.lower()
-                if ext not in analysis["structure"]:
-                    analysis["structure"][ext] = 0
-                analysis["structure"][ext] += 1
-        
-        # Detect technologies
-        if (path / "package.json").exists():
-            analysis["technologies"].append("Node.js")
-        if (path / "requirements.txt").exists() or (path / "pyproject.toml").exists():
-            analysis["technologies"].append("Python")
-        if (path / "Dockerfile").exists():
-            analysis["technologies"].append("Docker")
+        counts = Counter()
+        try:
+            for entry in _scandir_files(path):
+                counts[os.path.splitext(entry.name)[1].lower()] += 1
+        except _WalkLimitReached:
+            # Very large repo: report the sampled counts rather than hang
+            analysis["truncated"] = True
+        analysis["structure"] = dict(counts)
+        
+        # Detect technologies from a single listing of the root
+        try:
+            with os.scandir(path) as it:
+                names = {entry.name for entry in it if entry.is_file()}
+        except OSError:
+            names = set()  # Missing, not a directory, or unreadable
+        analysis["technologies"] = sorted(
+            {tech for marker, tech in _TECH_MARKERS.items() if marker in names}
+        )
         
         return analysis
     
@@ -172,6 +373,26 @@ Please provide a detailed architectural plan including:
 class CoderMode(BaseModeHandler):
     """Coder mode for implementation"""
     
+    __slots__ = ()
+
+    CLASS_KEYWORDS: FrozenSet[str] = frozenset({
+        "implement", "code", "write", "create", "build", "add",
+        "modify", "update", "fix", "function", "class", "method"
+    })
+    
+    _PROMPT_TEMPLATE = """
+Current Code Context:
+%s
+
+Implementation Request: %s
+
+Please provide:
+1. Complete implementation or clear diffs
+2. Explanation of changes and approach
+3. Any new dependencies or setup required
+4. Suggested tests for the implementation
+"""
+    
     def __init__(self, mcp_client=None):
         config = ModeConfig(
             name="coder",
@@ -209,18 +430,7 @@ Always provide complete file contents or clear diffs.""",
         # Enhanced with code analysis
         current_code = await self._get_relevant_code(request, context)
         
-        enhanced_prompt = f"""
-Current Code Context:
-{current_code}
-
-Implementation Request: {request}
-
-Please provide:
-1. Complete implementation or clear diffs
-2. Explanation of changes and approach
-3. Any new dependencies or setup required
-4. Suggested tests for the implementation
-"""
+        enhanced_prompt = self._PROMPT_TEMPLATE % (current_code, request)
         
         response = await self._call_llm(enhanced_prompt, context)
         
@@ -235,13 +445,6 @@ Please provide:
             "suggested_next_mode": self._suggest_next_mode(response)
         }
     
-    def can_handle_request(self, request: str, context: Dict[str, Any]) -> bool:
-        coder_keywords = [
-            "implement", "code", "write", "create", "build", "add",
-            "modify", "update", "fix", "function", "class", "method"
-        ]
-        return any(keyword in request.lower() for keyword in coder_keywords)
-    
     async def _get_relevant_code(self, request: str, context: Dict[str, Any]) -> str:
         """Get relevant existing code for context"""
         # This would integrate with your file reading capabilities
@@ -257,6 +460,27 @@ Please provide:
 class DebuggerMode(BaseModeHandler):
     """Debugger mode for problem diagnosis and fixing"""
     
+    __slots__ = ()
+
+    CLASS_KEYWORDS: FrozenSet[str] = frozenset({
+        "debug", "error", "bug", "issue", "problem", "broken",
+        "fails", "exception", "crash", "not working", "fix"
+    })
+    
+    _PROMPT_TEMPLATE = """
+Debug Information:
+%s
+
+Problem Description: %s
+
+Please provide:
+1. Root cause analysis
+2. Step-by-step debugging plan
+3. Proposed fixes with explanations
+4. Tests to verify the fix
+5. Prevention strategies for similar issues
+"""
+    
     def __init__(self, mcp_client=None):
         config = ModeConfig(
             name="debugger", 
@@ -290,19 +514,7 @@ Always be methodical and thorough in your debugging approach.""",
         # Enhanced with automated debugging
         debug_info = await self._gather_debug_info(context)
         
-        enhanced_prompt = f"""
-Debug Information:
-{json.dumps(debug_info, indent=2)}
-
-Problem Description: {request}
-
-Please provide:
-1. Root cause analysis
-2. Step-by-step debugging plan
-3. Proposed fixes with explanations
-4. Tests to verify the fix
-5. Prevention strategies for similar issues
-"""
+        enhanced_prompt = self._PROMPT_TEMPLATE % (_fmt(debug_info), request)
         
         response = await self._call_llm(enhanced_prompt, context)
         
@@ -314,13 +526,6 @@ Please provide:
             "suggested_next_mode": self._suggest_next_mode(response)
         }
     
-    def can_handle_request(self, request: str, context: Dict[str, Any]) -> bool:
-        debug_keywords = [
-            "debug", "error", "bug", "issue", "problem", "broken",
-            "fails", "exception", "crash", "not working", "fix"
-        ]
-        return any(keyword in request.lower() for keyword in debug_keywords)
-    
     async def _gather_debug_info(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Gather debugging information"""
         debug_info = {
@@ -332,13 +537,16 @@ Please provide:
         
         project_path = context.get("project_path")
         if project_path:
-            # Run tests if available
-            test_results = await self._run_tests(project_path)
-            debug_info["test_results"] = test_results
-            
-            # Check recent git changes
-            changes = await self._get_recent_changes(project_path)
-            debug_info["recent_changes"] = changes
+            # Tests and git history are independent; collect them concurrently
+            test_results, changes = await asyncio.gather(
+                self._run_tests(project_path),
+                self._get_recent_changes(project_path),
+                return_exceptions=True
+            )
+            if not isinstance(test_results, Exception):
+                debug_info["test_results"] = test_results
+            if not isinstance(changes, Exception):
+                debug_info["recent_changes"] = changes
         
         return debug_info
     
@@ -347,6 +555,19 @@ Please provide:
         # Implementation would run pytest, npm test, etc.
         return {}
     
+    async def _get_recent_changes(self, project_path: str, limit: int = 10) -> List[str]:
+        """Return the most recent git commits as one-line summaries"""
+        process = await asyncio.create_subprocess_exec(
+            "git", "log", f"-{limit}", "--oneline",
+            cwd=project_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+        if process.returncode != 0:
+            return []
+        return stdout.decode(errors="replace").splitlines()
+    
     def _extract_test_suggestions(self, response: str) -> List[str]:
         """Extract test suggestions from response"""
         # Parse test suggestions from response
@@ -355,10 +576,17 @@ Please provide:
 class CustomModeManager:
     """Manager for custom modes similar to KiloCode's custom modes"""
     
-    def __init__(self, modes_dir: Path = None):
+    _MMAP_THRESHOLD = 64 * 1024
+    
+    def __init__(self, modes_dir: Path = None, mcp_client=None):
         self.modes_dir = modes_dir or Path.home() / ".coding-swarm" / "modes"
+        self.mcp_client = mcp_client
         self.custom_modes: Dict[str, ModeConfig] = {}
-        self.mode_handlers: Dict[str, BaseModeHandler] = {}
+        # Handlers are built on first use; most sessions only touch one mode
+        self._handler_factories: Dict[str, Callable[..., BaseModeHandler]] = {}
+        self._handler_instances: Dict[str, BaseModeHandler] = {}
+        # keyword -> mode names, filled as handlers are registered
+        self._kw_index: Dict[str, List[str]] = {}
         
         # Initialize built-in modes
         self._initialize_builtin_modes()
@@ -367,71 +595,142 @@ class CustomModeManager:
         self._load_custom_modes()
     
     def _initialize_builtin_modes(self):
-        """Initialize built-in mode handlers"""
-        self.mode_handlers["architect"] = ArchitectMode()
-        self.mode_handlers["coder"] = CoderMode()
-        self.mode_handlers["debugger"] = DebuggerMode()
+        """Register built-in mode handler factories"""
+        for mode_name, handler_cls in (
+            ("architect", ArchitectMode),
+            ("coder", CoderMode),
+            ("debugger", DebuggerMode),
+        ):
+            self._handler_factories[mode_name] = handler_cls
+            self._index_keywords(mode_name, handler_cls.CLASS_KEYWORDS)
+    
+    def _index_keywords(self, mode_name: str, keywords: Iterable[str]):
+        """Add a mode's keywords to the reverse keyword -> modes index"""
+        for keyword in keywords:
+            modes = self._kw_index.setdefault(keyword, [])
+            if mode_name not in modes:
+                modes.append(mode_name)
     
     def _load_custom_modes(self):
         """Load custom modes from configuration files"""
         if not self.modes_dir.exists():
             return
         
-        for mode_file in self.modes_dir.glob("*.yaml"):
+        # JSON is the native format and wins over a legacy YAML file with the
+        # same name; YAML is read through _read_mode_file's cached JSON bake
+        mode_files = {path.stem: path for path in self.modes_dir.glob("*.yaml")}
+        mode_files.update((path.stem, path) for path in self.modes_dir.glob("*.json"))
+        
+        for mode_file in mode_files.values():
             try:
-                with open(mode_file) as f:
-                    mode_data = yaml.safe_load(f)
+                mode_data = self._read_mode_file(mode_file)
                 
                 config = ModeConfig(**mode_data)
                 self.custom_modes[config.name] = config
                 
-                # Create generic handler for custom mode
-                self.mode_handlers[config.name] = GenericModeHandler(config)
+                # Register generic handler for custom mode
+                self._register_custom_handler(config)
                 
             except Exception as e:
                 print(f"Failed to load custom mode {mode_file}: {e}")
     
+    def _register_custom_handler(self, config: ModeConfig):
+        """Register a generic handler factory for a custom mode"""
+        self._handler_factories[config.name] = partial(GenericModeHandler, config)
+        self._handler_instances.pop(config.name, None)
+        self._index_keywords(config.name, (config.name.lower(),))
+    
+    def _bake_path(self, mode_file: Path) -> Path:
+        """Cache file for a YAML mode's parsed JSON, kept apart from the
+        user's own ``<name>.json`` modes so a bake never overwrites one"""
+        return self.modes_dir / ".cache" / f"{mode_file.name}.json"
+    
+    def _read_mode_file(self, mode_file: Path) -> Dict[str, Any]:
+        """Read a mode file; YAML is read via an up-to-date cached bake if any"""
+        if mode_file.suffix == ".json":
+            with open(mode_file) as f:
+                return json.load(f)
+        
+        bake_file = self._bake_path(mode_file)
+        try:
+            if bake_file.stat().st_mtime_ns >= mode_file.stat().st_mtime_ns:
+                with open(bake_file) as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass  # No usable bake yet, parse the YAML below
+        
+        mode_data = self._load_yaml_file(mode_file)
+        
+        # Bake the parsed YAML to JSON so the next load skips the YAML parser
+        try:
+            baked = json.dumps(mode_data)
+            bake_file.parent.mkdir(exist_ok=True)
+            bake_file.write_text(baked)
+        except (OSError, TypeError):
+            pass
+        
+        return mode_data
+    
+    def _load_yaml_file(self, mode_file: Path) -> Any:
+        """Parse YAML from raw bytes, memory-mapping files above 64KB"""
+        with open(mode_file, "rb") as f:
+            # Binary reads skip text-mode decoding and newline translation
+            if os.fstat(f.fileno()).st_size <= self._MMAP_THRESHOLD:
+                return yaml.load(f, Loader=_YamlLoader)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return yaml.load(mm, Loader=_YamlLoader)
+    
     def create_custom_mode(self, config: ModeConfig):
         """Create a new custom mode"""
         self.custom_modes[config.name] = config
-        self.mode_handlers[config.name] = GenericModeHandler(config)
+        self._register_custom_handler(config)
         
         # Save to file
-        mode_file = self.modes_dir / f"{config.name}.yaml"
+        mode_file = self.modes_dir / f"{config.name}.json"
         self.modes_dir.mkdir(parents=True, exist_ok=True)
         
         with open(mode_file, 'w') as f:
-            yaml.dump(config.__dict__, f)
+            json.dump(_mode_config_to_dict(config), f, indent=2)
     
     def get_mode_handler(self, mode_name: str) -> Optional[BaseModeHandler]:
         """Get mode handler by name"""
-        return self.mode_handlers.get(mode_name)
+        handler = self._handler_instances.get(mode_name)
+        if handler is None and mode_name in self._handler_factories:
+            handler = self._handler_factories[mode_name](self.mcp_client)
+            self._handler_instances[mode_name] = handler
+        return handler
     
     def suggest_mode(self, request: str, context: Dict[str, Any]) -> str:
         """Suggest the best mode for a request"""
-        scores = {}
-        
-        for mode_name, handler in self.mode_handlers.items():
-            if handler.can_handle_request(request, context):
-                # Simple scoring - could be enhanced with ML
-                scores[mode_name] = 1.0
+        # One tokenize plus one index lookup per token scores every mode
+        tokens = _tokenize(request.lower())
+        scores = Counter(
+            mode_name for token in tokens for mode_name in self._kw_index.get(token, ())
+        )
         
         if not scores:
             return "coder"  # Default mode
         
-        return max(scores, key=scores.get)
+        # Ties resolve in registration order (built-ins first)
+        return max(self._handler_factories, key=lambda name: scores.get(name, 0))
 
 class GenericModeHandler(BaseModeHandler):
     """Generic handler for custom modes"""
     
-    async def process_request(self, request: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Process request using custom mode configuration"""
-        enhanced_prompt = f"""
-{self.config.system_prompt}
+    __slots__ = ()
+    
+    _PROMPT_TEMPLATE = """
+%s
 
-Request: {request}
-Context: {json.dumps(context, indent=2)}
+Request: %s
+Context: %s
 """
+    
+    async def process_request(self, request: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Process request using custom mode configuration"""
+        enhanced_prompt = self._PROMPT_TEMPLATE % (
+            self.config.system_prompt, request, _fmt(context)
+        )
         
         response = await self._call_llm(enhanced_prompt, context)
         
@@ -441,10 +740,9 @@ Context: {json.dumps(context, indent=2)}
             "suggested_next_mode": self.should_switch_mode(request, context)
         }
     
-    def can_handle_request(self, request: str, context: Dict[str, Any]) -> bool:
-        """Basic keyword matching for custom modes"""
-        # Could be enhanced with more sophisticated matching
-        return self.config.name.lower() in request.lower()
+    @property
+    def keywords(self) -> FrozenSet[str]:
+        return frozenset({self.config.name.lower()})
 
 # Example of creating a custom mode
 EXAMPLE_CUSTOM_MODES = {
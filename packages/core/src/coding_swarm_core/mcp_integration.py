@@ -1,28 +1,97 @@
 # packages/core/src/coding_swarm_core/mcp_integration.py
 """MCP (Model Context Protocol) Integration for Coding Swarm"""
 
+import hashlib
 import json
+import logging
+import os
+import time
 import asyncio
-import subprocess
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Literal, Mapping, Optional, Tuple
 from pathlib import Path
-from dataclasses import dataclass
+from types import MappingProxyType
+from collections import ChainMap, OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
 from abc import ABC, abstractmethod
 
-@dataclass
+import httpx
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(obj: Any) -> bytes:
+    """Compact JSON bytes for the RPC hot path"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+def _canonical(obj: Any) -> bytes:
+    """Key-sorted JSON bytes, equal for equal arguments"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True).encode()
+
+class _TTLCache:
+    """Small LRU cache whose entries also expire after ``ttl`` seconds"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: Any) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Any, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def discard_where(self, predicate):
+        for key in [key for key in self._data if predicate(key)]:
+            del self._data[key]
+    
+    def clear(self):
+        self._data.clear()
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
 class MCPServer:
     """MCP Server configuration"""
     name: str
-    command: List[str]
-    args: List[str] = None
-    env: Dict[str, str] = None
+    command: Tuple[str, ...] = ()
+    args: Tuple[str, ...] = ()
+    env: Tuple[Tuple[str, str], ...] = ()
     description: str = ""
-    capabilities: List[str] = None
-    
-    def __post_init__(self):
-        self.args = self.args or []
-        self.env = self.env or {}
-        self.capabilities = self.capabilities or []
+    capabilities: Tuple[str, ...] = ()
+    # Endpoint of an HTTP MCP server; when set, no process is spawned
+    url: Optional[str] = None
+    # stdio message framing: newline-delimited JSON or LSP-style Content-Length headers
+    framing: Literal["line", "length"] = "line"
+    # Drain server stderr into the debug log; False discards it instead
+    log_stderr: bool = True
+    # Server accepts JSON-RPC batch arrays. Batching left MCP in 2025-06-18
+    # and many servers ignore arrays, so requests are pipelined unless set
+    batching: bool = False
+    # Seconds to wait for a request's reply; None waits indefinitely, as
+    # long-running tools/call requests need. The initialize handshake and
+    # capability discovery are bounded by _HANDSHAKE_TIMEOUT instead
+    timeout: Optional[float] = None
 
 class MCPTransport(ABC):
     """Abstract MCP Transport"""
@@ -31,6 +100,12 @@ class MCPTransport(ABC):
     async def send_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
         pass
     
+    async def send_batch(self, requests: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Send several requests; responses are returned in request order"""
+        return list(await asyncio.gather(
+            *(self.send_request(method, params) for method, params in requests)
+        ))
+    
     @abstractmethod
     async def start(self):
         pass
@@ -38,27 +113,56 @@ class MCPTransport(ABC):
     @abstractmethod
     async def stop(self):
         pass
+    
+    @property
+    def is_alive(self) -> bool:
+        """Whether the transport can still carry requests"""
+        return True
+
+# StreamReader buffer limit for server stdout; asyncio's 64 KiB default is
+# smaller than a single tools/list or resources/read reply can be
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+# Bound on the initialize handshake and capability discovery, so a server
+# that never answers cannot hang add_server
+_HANDSHAKE_TIMEOUT = 30.0
+
+class _BatchRejected(Exception):
+    """The server answered a JSON-RPC batch with a single id-less error"""
 
 class STDIOTransport(MCPTransport):
     """STDIO Transport for local MCP servers"""
     
     def __init__(self, server: MCPServer):
         self.server = server
-        self.process: Optional[subprocess.Popen] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
         self.request_id = 0
+        # Requests in flight, keyed by JSON-RPC id and resolved by _reader_loop
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        # Batches with no response yet: first request id -> member ids
+        self._unacked_batches: "OrderedDict[int, List[int]]" = OrderedDict()
+        self.supports_batch = server.batching
     
     async def start(self):
         """Start the MCP server process"""
-        env = {**self.server.env, "PATH": os.environ.get("PATH", "")}
+        # Inherit the parent environment (HOME, APPDATA, ... keep npx caches warm)
+        env = {**os.environ, **dict(self.server.env)}
         
-        self.process = subprocess.Popen(
-            self.server.command + self.server.args,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+        self.process = await asyncio.create_subprocess_exec(
+            *self.server.command, *self.server.args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE if self.server.log_stderr else asyncio.subprocess.DEVNULL,
             env=env,
-            text=True
+            limit=_STREAM_LIMIT
         )
+        self._reader_task = asyncio.create_task(self._reader_loop())
+        if self.server.log_stderr:
+            # An undrained stderr pipe fills up and blocks the server on write
+            self._stderr_task = asyncio.create_task(self._drain_stderr())
         
         # Initialize the server
         await self._send_jsonrpc({
@@ -76,16 +180,30 @@ class STDIOTransport(MCPTransport):
                     "version": "2.0.0"
                 }
             }
-        })
+        }, _HANDSHAKE_TIMEOUT)
     
     async def stop(self):
         """Stop the MCP server process"""
-        if self.process:
+        if self._reader_task:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._stderr_task:
+            self._stderr_task.cancel()
+            self._stderr_task = None
+        self._fail_pending(RuntimeError("MCP server stopped"))
+        
+        if self.process and self.process.returncode is None:
             self.process.terminate()
+            # Keep reading stdout: a pipe paused on a full buffer never sees
+            # EOF, and wait() doesn't return until every pipe has closed
+            drain = asyncio.create_task(self._discard_stdout())
             try:
                 await asyncio.wait_for(self.process.wait(), timeout=5.0)
             except asyncio.TimeoutError:
                 self.process.kill()
+                await self.process.wait()
+            finally:
+                drain.cancel()
     
     async def send_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Send a request to the MCP server"""
@@ -96,59 +214,552 @@ class STDIOTransport(MCPTransport):
             "params": params
         }
         
-        return await self._send_jsonrpc(request)
+        return await self._send_jsonrpc(request, self.server.timeout)
+    
+    async def send_batch(self, requests: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Send requests as one JSON-RPC batch message"""
+        self._check_connected()
+        if not requests:
+            return []
+        if not self.supports_batch:
+            return await super().send_batch(requests)
+        
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "id": self._next_request_id(),
+                "method": method,
+                "params": params
+            }
+            for method, params in requests
+        ]
+        loop = asyncio.get_running_loop()
+        futures = []
+        for request in batch:
+            future = loop.create_future()
+            self._pending[request["id"]] = future
+            futures.append(future)
+        
+        batch_ids = [request["id"] for request in batch]
+        batch_line = self._frame(_dumps(batch))
+        try:
+            async with self._write_lock:
+                self._unacked_batches[batch_ids[0]] = batch_ids
+                self.process.stdin.write(batch_line)
+                await self.process.stdin.drain()
+        except Exception:
+            self._unacked_batches.pop(batch_ids[0], None)
+            for request_id in batch_ids:
+                self._pending.pop(request_id, None)
+            raise
+        
+        try:
+            return list(await asyncio.gather(*futures))
+        except _BatchRejected:
+            # Server predates batch support; send requests individually from now on
+            self.supports_batch = False
+            return await super().send_batch(requests)
+        finally:
+            # Cancelled or timed out: stop routing replies to this batch
+            self._unacked_batches.pop(batch_ids[0], None)
+            for request_id in batch_ids:
+                self._pending.pop(request_id, None)
+    
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self.process is not None
+            and self.process.returncode is None
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
+    
+    def _check_connected(self):
+        """Fail fast instead of waiting on replies nobody will route"""
+        if not self.process:
+            raise RuntimeError("MCP server not started")
+        if self._reader_task is None or self._reader_task.done():
+            raise RuntimeError(f"MCP server {self.server.name} connection closed")
     
     def _next_request_id(self) -> int:
         self.request_id += 1
         return self.request_id
     
-    async def _send_jsonrpc(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _send_jsonrpc(self, request: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
         """Send JSON-RPC request and get response"""
-        if not self.process:
+        self._check_connected()
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request["id"]] = future
+        
+        request_line = self._frame(_dumps(request))
+        try:
+            # Serialize writers so concurrent requests never interleave on stdin
+            async with self._write_lock:
+                self.process.stdin.write(request_line)
+                await self.process.stdin.drain()
+        except Exception:
+            self._pending.pop(request["id"], None)
+            raise
+        
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            # After a timeout or cancellation a late reply is just dropped
+            self._pending.pop(request["id"], None)
+    
+    async def _reader_loop(self):
+        """Route responses to waiting requests by id, in any order"""
+        try:
+            while True:
+                try:
+                    payload = await self._read_message()
+                except (ValueError, asyncio.LimitOverrunError) as e:
+                    # Oversized or malformed frame; the stream can't be resynced
+                    logger.warning("%s: dropping MCP connection: %s", self.server.name, e)
+                    break
+                if payload is None:
+                    break
+                try:
+                    message = _loads(payload)
+                except ValueError:
+                    continue  # Ignore non-JSON output on stdout
+                if isinstance(message, list):  # Batch response
+                    if message and isinstance(message[0], dict):
+                        self._ack_batch(message[0].get("id"))
+                    for item in message:
+                        self._dispatch(item)
+                elif isinstance(message, dict) and message.get("id") is None and "error" in message:
+                    self._reject_batch()
+                else:
+                    self._dispatch(message)
+        finally:
+            self._fail_pending(RuntimeError("No response from MCP server"))
+    
+    async def _discard_stdout(self):
+        while await self.process.stdout.read(_STREAM_LIMIT):
+            pass
+    
+    async def _drain_stderr(self):
+        """Forward server stderr to the debug log"""
+        async for line in self.process.stderr:
+            logger.debug("%s stderr: %s", self.server.name, line.decode(errors="replace").rstrip())
+    
+    def _frame(self, payload: bytes) -> bytes:
+        if self.server.framing == "length":
+            return b"Content-Length: %d\r\n\r\n" % len(payload) + payload
+        return payload + b"\n"
+    
+    async def _read_message(self) -> Optional[bytes]:
+        """Read one framed message from stdout; None at end of stream"""
+        stdout = self.process.stdout
+        if self.server.framing != "length":
+            return await stdout.readline() or None
+        
+        length = None
+        while True:
+            header = await stdout.readline()
+            if not header:
+                return None
+            header = header.strip()
+            if not header:
+                if length is not None:
+                    break
+                continue
+            name, _, value = header.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        try:
+            return await stdout.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return None
+    
+    def _dispatch(self, message: Any):
+        """Resolve the future waiting on a response message"""
+        if not isinstance(message, dict) or "method" in message:
+            # Server-to-client requests carry the server's own ids, which
+            # can collide with ours; they are not replies
+            return
+        future = self._pending.pop(message.get("id"), None)
+        if future is not None and not future.done():
+            future.set_result(message)
+    
+    def _ack_batch(self, request_id: Any):
+        """Forget a batch once the server has answered it as a batch"""
+        for first_id, batch_ids in self._unacked_batches.items():
+            if request_id in batch_ids:
+                del self._unacked_batches[first_id]
+                return
+    
+    def _reject_batch(self):
+        """Fail the oldest unanswered batch after an id-less error reply"""
+        if not self._unacked_batches:
+            return
+        _, batch_ids = self._unacked_batches.popitem(last=False)
+        for request_id in batch_ids:
+            future = self._pending.pop(request_id, None)
+            if future is not None and not future.done():
+                future.set_exception(_BatchRejected())
+    
+    def _fail_pending(self, error: Exception):
+        """Fail every in-flight request, e.g. when the server goes away"""
+        pending, self._pending = self._pending, {}
+        self._unacked_batches.clear()
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+# One keep-alive client shared by every HTTPTransport, closed with the last one
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_users = 0
+
+def _acquire_http_client() -> httpx.AsyncClient:
+    global _http_client, _http_client_users
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=60,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60)
+        )
+    _http_client_users += 1
+    return _http_client
+
+async def _release_http_client():
+    global _http_client, _http_client_users
+    _http_client_users -= 1
+    if _http_client_users <= 0 and _http_client is not None:
+        client, _http_client, _http_client_users = _http_client, None, 0
+        await client.aclose()
+
+class HTTPTransport(MCPTransport):
+    """HTTP Transport for MCP servers listening on a URL"""
+    
+    def __init__(self, server: MCPServer, client: Optional[httpx.AsyncClient] = None):
+        self.server = server
+        self.url = server.url
+        self.request_id = 0
+        self.session_id: Optional[str] = None
+        self._client = client
+        self._owns_client = client is None
+        self.supports_batch = server.batching
+    
+    async def start(self):
+        """Attach to the shared client and initialize the session"""
+        if self._client is None:
+            self._client = _acquire_http_client()
+        await self.send_request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "roots": {"listChanged": True},
+                "sampling": {}
+            },
+            "clientInfo": {
+                "name": "coding-swarm",
+                "version": "2.0.0"
+            }
+        })
+    
+    async def stop(self):
+        """Detach from the shared client"""
+        client, self._client = self._client, None
+        if client is not None and self._owns_client:
+            await _release_http_client()
+    
+    @property
+    def is_alive(self) -> bool:
+        return self._client is not None
+    
+    async def send_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request to the MCP server"""
+        self.request_id += 1
+        return await self._post({
+            "jsonrpc": "2.0",
+            "id": self.request_id,
+            "method": method,
+            "params": params
+        })
+    
+    async def send_batch(self, requests: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Send requests as one JSON-RPC batch POST"""
+        if not requests:
+            return []
+        if not self.supports_batch:
+            return await super().send_batch(requests)
+        
+        batch = []
+        for method, params in requests:
+            self.request_id += 1
+            batch.append({"jsonrpc": "2.0", "id": self.request_id, "method": method, "params": params})
+        
+        try:
+            response = await self._post(batch)
+        except httpx.HTTPStatusError:
+            response = None
+        if not isinstance(response, list):
+            # Server predates batch support; send requests individually from now on
+            self.supports_batch = False
+            return await super().send_batch(requests)
+        
+        by_id = {item.get("id"): item for item in response if isinstance(item, dict)}
+        return [by_id.get(request["id"], {}) for request in batch]
+    
+    async def _post(self, payload: Any) -> Any:
+        if self._client is None:
             raise RuntimeError("MCP server not started")
         
-        request_line = json.dumps(request) + "\n"
-        self.process.stdin.write(request_line)
-        self.process.stdin.flush()
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json, text/event-stream"
+        }
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        
+        response = await self._client.post(self.url, content=_dumps(payload), headers=headers)
+        response.raise_for_status()
+        self.session_id = response.headers.get("Mcp-Session-Id", self.session_id)
         
-        response_line = self.process.stdout.readline()
-        if not response_line:
-            raise RuntimeError("No response from MCP server")
+        if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+            # Streamable HTTP: the reply is the last SSE data event
+            data = [line[5:].strip() for line in response.text.splitlines() if line.startswith("data:")]
+            return _loads(data[-1]) if data else {}
+        return _loads(response.content)
+
+class MCPTransportPool:
+    """Pool of started transports for one MCP server
+    
+    Transports pipeline requests, so concurrent callers share them: each
+    call goes to the least loaded live transport, and another one is
+    started only once every transport has ``max_inflight`` calls
+    outstanding, up to ``max_size`` in total. Dead transports are dropped
+    and replaced on demand.
+    """
+    
+    def __init__(self, server: MCPServer, min_size: int = 1, max_size: int = 4,
+                 factory=STDIOTransport, health_interval: Optional[float] = 30.0,
+                 max_inflight: int = 32):
+        self.server = server
+        self._min = max(0, min_size)
+        self._max = max(1, max_size, self._min)
+        self._max_inflight = max(1, max_inflight)
+        self._factory = factory
+        self._health_interval = health_interval
+        self._transports: List[MCPTransport] = []
+        # Calls currently using each transport in self._transports
+        self._inflight: Dict[MCPTransport, int] = {}
+        # Serializes scale-up so a burst of callers starts one transport
+        self._spawn_lock = asyncio.Lock()
+        self._closed = False
+        self._health_task: Optional[asyncio.Task] = None
+    
+    @property
+    def size(self) -> int:
+        return len(self._transports)
+    
+    async def start(self):
+        """Pre-warm ``min_size`` transports"""
+        transports = await asyncio.gather(
+            *(self._spawn() for _ in range(self._min)),
+            return_exceptions=True
+        )
+        errors = [t for t in transports if isinstance(t, BaseException)]
+        for transport in transports:
+            if not isinstance(transport, BaseException):
+                self._add(transport)
+        if errors and not self._transports:
+            await self.close()
+            raise errors[0]
+        if self._health_interval:
+            self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def _spawn(self) -> MCPTransport:
+        transport = self._factory(self.server)
+        try:
+            await transport.start()
+        except BaseException:
+            await transport.stop()
+            raise
+        return transport
+    
+    def _add(self, transport: MCPTransport):
+        self._transports.append(transport)
+        self._inflight[transport] = 0
+    
+    def _least_loaded(self) -> Optional[MCPTransport]:
+        """Live transport with the fewest calls in flight, dropping dead ones"""
+        best = None
+        for transport in list(self._transports):
+            if not transport.is_alive:
+                self._discard(transport)
+            elif best is None or self._inflight[transport] < self._inflight[best]:
+                best = transport
+        return best
+    
+    def _has_room(self, transport: Optional[MCPTransport]) -> bool:
+        return transport is not None and (
+            self._inflight[transport] < self._max_inflight or len(self._transports) >= self._max
+        )
+    
+    async def _acquire(self) -> MCPTransport:
+        if self._closed:
+            raise RuntimeError(f"MCP pool for {self.server.name} is closed")
+        transport = self._least_loaded()
+        if self._has_room(transport):
+            return transport
         
-        return json.loads(response_line.strip())
+        async with self._spawn_lock:
+            # Another caller may have added a transport while we waited
+            transport = self._least_loaded()
+            if self._has_room(transport):
+                return transport
+            try:
+                spawned = await self._spawn()
+            except Exception:
+                if transport is None:
+                    raise
+                return transport  # Overloaded beats failing the call
+            if self._closed:
+                await spawned.stop()
+                raise RuntimeError(f"MCP pool for {self.server.name} is closed")
+            self._add(spawned)
+            return spawned
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """Use a transport for the ``async with`` block; others may share it"""
+        transport = await self._acquire()
+        self._inflight[transport] += 1
+        try:
+            yield transport
+        finally:
+            self.release(transport)
+    
+    def release(self, transport: MCPTransport):
+        """Finish one use of a transport; dead ones are dropped, and after
+        close() each transport is stopped when its last call finishes"""
+        if transport not in self._inflight:
+            return
+        self._inflight[transport] -= 1
+        if not transport.is_alive or (self._closed and self._inflight[transport] == 0):
+            self._discard(transport)
+    
+    def _discard(self, transport: MCPTransport):
+        if transport not in self._inflight:
+            return
+        del self._inflight[transport]
+        self._transports.remove(transport)
+        asyncio.ensure_future(transport.stop())
+    
+    async def _health_loop(self):
+        """Ping idle transports periodically and evict the ones that fail"""
+        while not self._closed:
+            await asyncio.sleep(self._health_interval)
+            # Transports with calls in flight are evidently answering
+            idle = [t for t in self._transports if self._inflight[t] == 0]
+            results = await asyncio.gather(
+                *(asyncio.wait_for(t.send_request("ping", {}), timeout=5.0) for t in idle),
+                return_exceptions=True
+            )
+            for transport, result in zip(idle, results):
+                if isinstance(result, BaseException):
+                    self._discard(transport)
+    
+    async def close(self):
+        """Stop every idle transport; busy ones are stopped on release"""
+        self._closed = True
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        idle = [t for t in self._transports if self._inflight[t] == 0]
+        for transport in idle:
+            del self._inflight[transport]
+            self._transports.remove(transport)
+        await asyncio.gather(*(t.stop() for t in idle), return_exceptions=True)
 
 class MCPClient:
     """MCP Client for managing multiple servers"""
     
-    def __init__(self):
+    # Tools whose results depend only on their arguments for the cache TTL
+    IDEMPOTENT_TOOLS = frozenset({
+        "git_log", "git_diff", "git_status", "git_show",
+        "list_directory", "read_file"
+    })
+    
+    def __init__(self, pool_min_size: int = 1, pool_max_size: int = 4,
+                 cache_size: int = 1024, cache_ttl: float = 60.0):
         self.servers: Dict[str, MCPServer] = {}
-        self.transports: Dict[str, MCPTransport] = {}
+        self.pools: Dict[str, MCPTransportPool] = {}
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
         self.tools: Dict[str, Dict[str, Any]] = {}
         self.resources: Dict[str, Dict[str, Any]] = {}
+        # Exact resource URI -> key in self.resources
+        self._resource_by_uri: Dict[str, str] = {}
+        # Tool key -> (pool, tool name on its server), the call_tool hot path
+        self._tool_dispatch: Dict[str, Tuple[MCPTransportPool, str]] = {}
+        # Catalogue columns, kept parallel; _tool_index maps tool key -> row
+        self._tool_names: List[str] = []
+        self._tool_servers: List[str] = []
+        self._tool_descs: List[str] = []
+        self._tool_schemas: List[Dict[str, Any]] = []
+        self._tool_index: Dict[str, int] = {}
+        # Results of idempotent tool calls and resource reads, keyed by
+        # (tool or resource key, canonical arguments)
+        self._call_cache = _TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._idempotent = set(self.IDEMPOTENT_TOOLS)
+        # Derived catalogue views, rebuilt lazily after discovery/shutdown
+        self._tools_list_cache: Optional[List[Dict[str, Any]]] = None
+        self._tools_json_cache: Optional[str] = None
+        self._resources_list_cache: Optional[List[Dict[str, Any]]] = None
+        # Bumped whenever the catalogue changes; the rendered prompt is
+        # reused while its version matches
+        self._catalogue_version = 0
+        self._cached_prompt_version = -1
+        self._cached_prompt_parts: Tuple[str, str] = ("", "")
     
     async def add_server(self, server: MCPServer):
         """Add and start an MCP server"""
-        transport = STDIOTransport(server)
+        factory = HTTPTransport if server.url else STDIOTransport
+        pool = MCPTransportPool(server, self.pool_min_size, self.pool_max_size, factory=factory)
         
         try:
-            await transport.start()
+            await pool.start()
             self.servers[server.name] = server
-            self.transports[server.name] = transport
+            self.pools[server.name] = pool
             
             # Discover tools and resources
             await self._discover_capabilities(server.name)
             
         except Exception as e:
             print(f"Failed to start MCP server {server.name}: {e}")
-            await transport.stop()
+            self.servers.pop(server.name, None)
+            self.pools.pop(server.name, None)
+            await pool.close()
     
     async def _discover_capabilities(self, server_name: str):
         """Discover tools and resources from a server"""
-        transport = self.transports[server_name]
+        pool = self.pools[server_name]
+        requests = [("tools/list", {}), ("resources/list", {})]
+        try:
+            async with pool.acquire() as transport:
+                # Tools and resources are listed in one round-trip: a batch for
+                # servers configured with batching, pipelined requests otherwise
+                try:
+                    tools_response, resources_response = await asyncio.wait_for(
+                        transport.send_batch(requests), timeout=_HANDSHAKE_TIMEOUT
+                    )
+                except Exception:
+                    if not transport.supports_batch:
+                        raise
+                    # Configured for batching, but the array went unanswered
+                    transport.supports_batch = False
+                    tools_response, resources_response = await asyncio.wait_for(
+                        MCPTransport.send_batch(transport, requests), timeout=_HANDSHAKE_TIMEOUT
+                    )
+        except Exception as e:
+            print(f"Failed to discover capabilities of {server_name}: {e}")
+            return
         
         # List available tools
         try:
-            tools_response = await transport.send_request("tools/list", {})
             if "result" in tools_response and "tools" in tools_response["result"]:
                 for tool in tools_response["result"]["tools"]:
                     tool_key = f"{server_name}:{tool['name']}"
@@ -156,12 +767,13 @@ class MCPClient:
                         "server": server_name,
                         "tool": tool
                     }
+                    self._tool_dispatch[tool_key] = (pool, tool["name"])
+                    self._set_tool_row(tool_key, server_name, tool)
         except Exception as e:
             print(f"Failed to list tools from {server_name}: {e}")
         
         # List available resources
         try:
-            resources_response = await transport.send_request("resources/list", {})
             if "result" in resources_response and "resources" in resources_response["result"]:
                 for resource in resources_response["result"]["resources"]:
                     resource_key = f"{server_name}:{resource['uri']}"
@@ -169,58 +781,156 @@ class MCPClient:
                         "server": server_name,
                         "resource": resource
                     }
+                    self._resource_by_uri[resource["uri"]] = resource_key
         except Exception as e:
             print(f"Failed to list resources from {server_name}: {e}")
+        
+        self._invalidate_catalogue()
+    
+    def _set_tool_row(self, tool_key: str, server_name: str, tool: Dict[str, Any]):
+        """Insert or overwrite a tool's row in the catalogue columns"""
+        row = self._tool_index.get(tool_key)
+        if row is None:
+            self._tool_index[tool_key] = len(self._tool_names)
+            self._tool_names.append(tool_key)
+            self._tool_servers.append(server_name)
+            self._tool_descs.append(tool.get("description", ""))
+            self._tool_schemas.append(tool.get("inputSchema", {}))
+        else:
+            self._tool_servers[row] = server_name
+            self._tool_descs[row] = tool.get("description", "")
+            self._tool_schemas[row] = tool.get("inputSchema", {})
+    
+    def _invalidate_catalogue(self):
+        """Drop cached tool/resource views after the catalogue changes"""
+        self._catalogue_version += 1
+        self._tools_list_cache = None
+        self._tools_json_cache = None
+        self._resources_list_cache = None
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Call a tool via MCP"""
-        if tool_name not in self.tools:
+        entry = self._tool_dispatch.get(tool_name)
+        if entry is None:
             available_tools = list(self.tools.keys())
             raise ValueError(f"Tool {tool_name} not found. Available: {available_tools}")
         
-        tool_info = self.tools[tool_name]
-        server_name = tool_info["server"]
-        transport = self.transports[server_name]
+        pool, raw_name = entry
+        if raw_name not in self._idempotent:
+            # A tool with side effects may change what reads on its server return
+            self.invalidate(server=pool.server.name)
+            async with pool.acquire() as transport:
+                return await transport.send_request("tools/call", {
+                    "name": raw_name,
+                    "arguments": arguments
+                })
         
-        return await transport.send_request("tools/call", {
-            "name": tool_info["tool"]["name"],
-            "arguments": arguments
-        })
+        cache_key = (tool_name, _canonical(arguments))
+        response = self._call_cache.get(cache_key)
+        if response is None:
+            async with pool.acquire() as transport:
+                response = await transport.send_request("tools/call", {
+                    "name": raw_name,
+                    "arguments": arguments
+                })
+            if "error" not in response:
+                self._call_cache.set(cache_key, response)
+        return response
+    
+    async def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Call several tools at once, batching calls that share a server
+        
+        Results are returned in the same order as ``calls``.
+        """
+        by_pool: Dict[MCPTransportPool, List[Tuple[int, Tuple[str, Dict[str, Any]]]]] = {}
+        for index, (tool_name, arguments) in enumerate(calls):
+            entry = self._tool_dispatch.get(tool_name)
+            if entry is None:
+                available_tools = list(self.tools.keys())
+                raise ValueError(f"Tool {tool_name} not found. Available: {available_tools}")
+            pool, raw_name = entry
+            if raw_name not in self._idempotent:
+                self.invalidate(server=pool.server.name)
+            by_pool.setdefault(pool, []).append((index, (
+                "tools/call",
+                {"name": raw_name, "arguments": arguments}
+            )))
+        
+        pools = list(by_pool)
+        batches = await asyncio.gather(*(
+            self._send_pool_batch(pool, [request for _, request in by_pool[pool]])
+            for pool in pools
+        ))
+        
+        results: List[Dict[str, Any]] = [{}] * len(calls)
+        for pool, responses in zip(pools, batches):
+            for (index, _), response in zip(by_pool[pool], responses):
+                results[index] = response
+        return results
+    
+    async def _send_pool_batch(self, pool: MCPTransportPool,
+                               requests: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        async with pool.acquire() as transport:
+            return await transport.send_batch(requests)
     
     async def read_resource(self, resource_uri: str) -> Dict[str, Any]:
         """Read a resource via MCP"""
-        resource_key = None
-        for key in self.resources:
-            if key.endswith(resource_uri):
-                resource_key = key
-                break
-        
-        if not resource_key:
+        resource_key = self._resource_by_uri.get(resource_uri)
+        if resource_key is None:
             available_resources = list(self.resources.keys())
             raise ValueError(f"Resource {resource_uri} not found. Available: {available_resources}")
         
+        cache_key = (resource_key, None)
+        response = self._call_cache.get(cache_key)
+        if response is not None:
+            return response
+        
         resource_info = self.resources[resource_key]
         server_name = resource_info["server"]
-        transport = self.transports[server_name]
         
-        return await transport.send_request("resources/read", {
-            "uri": resource_info["resource"]["uri"]
-        })
+        async with self.pools[server_name].acquire() as transport:
+            response = await transport.send_request("resources/read", {
+                "uri": resource_info["resource"]["uri"]
+            })
+        if "error" not in response:
+            self._call_cache.set(cache_key, response)
+        return response
+    
+    def invalidate(self, tool_name: Optional[str] = None, server: Optional[str] = None):
+        """Drop memoized results for one tool, one server, or everything"""
+        if tool_name is not None:
+            self._call_cache.discard_where(lambda key: key[0] == tool_name)
+        elif server is not None:
+            prefix = f"{server}:"
+            self._call_cache.discard_where(lambda key: key[0].startswith(prefix))
+        else:
+            self._call_cache.clear()
     
     def list_available_tools(self) -> List[Dict[str, Any]]:
         """List all available tools"""
+        if self._tools_list_cache is None:
+            self._tools_list_cache = self._build_tools_list()
+        return self._tools_list_cache
+    
+    def _build_tools_list(self) -> List[Dict[str, Any]]:
         return [
-            {
-                "name": tool_name,
-                "server": tool_info["server"],
-                "description": tool_info["tool"].get("description", ""),
-                "schema": tool_info["tool"].get("inputSchema", {})
-            }
-            for tool_name, tool_info in self.tools.items()
+            {"name": name, "server": server, "description": desc, "schema": schema}
+            for name, server, desc, schema in zip(
+                self._tool_names, self._tool_servers, self._tool_descs, self._tool_schemas
+            )
         ]
     
+    def list_tool_names(self) -> List[str]:
+        """Tool keys in discovery order (read-only view; do not mutate)"""
+        return self._tool_names
+    
     def list_available_resources(self) -> List[Dict[str, Any]]:
         """List all available resources"""
+        if self._resources_list_cache is None:
+            self._resources_list_cache = self._build_resources_list()
+        return self._resources_list_cache
+    
+    def _build_resources_list(self) -> List[Dict[str, Any]]:
         return [
             {
                 "uri": resource_info["resource"]["uri"],
@@ -231,44 +941,95 @@ class MCPClient:
             for resource_key, resource_info in self.resources.items()
         ]
     
+    def tools_system_prompt(self) -> str:
+        """Tool catalogue as indented JSON, serialized once per catalogue"""
+        if self._tools_json_cache is None:
+            self._tools_json_cache = json.dumps(self.list_available_tools(), indent=2)
+        return self._tools_json_cache
+    
+    def render_tools_prompt(self, task: str) -> str:
+        """System prompt listing the available tools for ``task``
+        
+        The text around the task is rendered once per catalogue version, so
+        every turn sends the same prompt prefix.
+        """
+        if self._cached_prompt_version != self._catalogue_version:
+            self._cached_prompt_parts = (
+                f"""
+You have access to the following MCP tools:
+{self.tools_system_prompt()}
+
+Use these tools to help complete the task: """,
+                """
+Call tools using the format: mcp_call(tool_name, arguments)
+"""
+            )
+            self._cached_prompt_version = self._catalogue_version
+        head, tail = self._cached_prompt_parts
+        return head + task + tail
+    
     async def shutdown(self):
         """Shutdown all MCP servers"""
-        for transport in self.transports.values():
-            await transport.stop()
+        await asyncio.gather(
+            *(pool.close() for pool in self.pools.values()),
+            return_exceptions=True
+        )
         
         self.servers.clear()
-        self.transports.clear()
+        self.pools.clear()
         self.tools.clear()
         self.resources.clear()
+        self._resource_by_uri.clear()
+        self._tool_dispatch.clear()
+        self._tool_names.clear()
+        self._tool_servers.clear()
+        self._tool_descs.clear()
+        self._tool_schemas.clear()
+        self._tool_index.clear()
+        self._call_cache.clear()
+        self._invalidate_catalogue()
 
 # MCP Server Registry - Built-in servers similar to KiloCode's marketplace
-BUILTIN_SERVERS = {
+BUILTIN_SERVERS: Mapping[str, MCPServer] = MappingProxyType({
     "filesystem": MCPServer(
         name="filesystem",
-        command=["npx", "-y", "@modelcontextprotocol/server-filesystem"],
-        args=["/path/to/allowed/directory"],
+        command=("npx", "-y", "@modelcontextprotocol/server-filesystem"),
+        args=("/path/to/allowed/directory",),
         description="File system operations",
-        capabilities=["read_file", "write_file", "create_directory", "list_directory"]
+        capabilities=("read_file", "write_file", "create_directory", "list_directory")
     ),
     "git": MCPServer(
         name="git",
-        command=["npx", "-y", "@modelcontextprotocol/server-git"],
+        command=("npx", "-y", "@modelcontextprotocol/server-git"),
         description="Git repository operations",
-        capabilities=["git_log", "git_diff", "git_status", "git_show"]
+        capabilities=("git_log", "git_diff", "git_status", "git_show")
     ),
     "github": MCPServer(
         name="github",
-        command=["npx", "-y", "@modelcontextprotocol/server-github"],
+        command=("npx", "-y", "@modelcontextprotocol/server-github"),
         description="GitHub API integration",
-        capabilities=["create_issue", "list_repos", "search_repos"]
+        capabilities=("create_issue", "list_repos", "search_repos")
     ),
     "brave-search": MCPServer(
         name="brave-search",
-        command=["npx", "-y", "@modelcontextprotocol/server-brave-search"],
+        command=("npx", "-y", "@modelcontextprotocol/server-brave-search"),
         description="Web search via Brave",
-        capabilities=["web_search"]
+        capabilities=("web_search",)
     )
-}
+})
+
+def _server_from_config(server_config: Dict[str, Any]) -> MCPServer:
+    """Build an MCPServer from its JSON form (lists and an env mapping)"""
+    config = dict(server_config)
+    for key in ("command", "args", "capabilities"):
+        if key in config:
+            config[key] = tuple(config[key] or ())
+    if "env" in config:
+        config["env"] = tuple(dict(config["env"] or {}).items())
+    return MCPServer(**config)
+
+# Parsed custom server configs: path -> (st_mtime_ns, st_size, servers)
+_CONFIG_CACHE: Dict[Path, Tuple[int, int, Dict[str, MCPServer]]] = {}
 
 class MCPRegistry:
     """Registry for MCP servers similar to KiloCode's marketplace"""
@@ -276,90 +1037,180 @@ class MCPRegistry:
     def __init__(self, config_path: Path = None):
         self.config_path = config_path or Path.home() / ".coding-swarm" / "mcp-servers.json"
         self.custom_servers: Dict[str, MCPServer] = {}
+        # Live view over custom then builtin servers; no copy per lookup
+        self._all_servers: ChainMap = ChainMap(self.custom_servers, BUILTIN_SERVERS)
+        # Writes are coalesced: add_custom_server marks the registry dirty and
+        # a short-lived task flushes once the burst of additions is over
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self._saved_digest: Optional[bytes] = None
         self.load_custom_servers()
     
     def load_custom_servers(self):
         """Load custom MCP servers from config"""
-        if not self.config_path.exists():
+        try:
+            st = self.config_path.stat()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"Failed to load MCP server config: {e}")
+            return
+        
+        if st.st_size == 0:
+            return
+        
+        cached = _CONFIG_CACHE.get(self.config_path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            self.custom_servers.update(cached[2])
             return
         
         try:
-            with open(self.config_path) as f:
-                config = json.load(f)
+            with open(self.config_path, 'rb') as f:
+                config = _loads(f.read())
             
-            for name, server_config in config.items():
-                self.custom_servers[name] = MCPServer(**server_config)
+            servers = {
+                name: _server_from_config(server_config)
+                for name, server_config in config.items()
+            }
         except Exception as e:
             print(f"Failed to load MCP server config: {e}")
+            return
+        
+        # Servers are frozen, so registries can share the parsed instances
+        _CONFIG_CACHE[self.config_path] = (st.st_mtime_ns, st.st_size, servers)
+        self.custom_servers.update(servers)
     
     def save_custom_servers(self):
         """Save custom MCP servers to config"""
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+        self._dirty = False
+        config = {name: asdict(server) for name, server in self.custom_servers.items()}
+        for server_config in config.values():
+            server_config["env"] = dict(server_config["env"])
+        if orjson is not None:
+            data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(config, indent=2).encode()
         
-        config = {
-            name: {
-                "name": server.name,
-                "command": server.command,
-                "args": server.args,
-                "env": server.env,
-                "description": server.description,
-                "capabilities": server.capabilities
-            }
-            for name, server in self.custom_servers.items()
-        }
+        digest = hashlib.sha256(data).digest()
+        if digest == self._saved_digest:
+            return
+        self._save_atomic(data)
+        self._saved_digest = digest
+    
+    def _save_atomic(self, data: bytes):
+        """Replace the config file so readers never see a partial write"""
+        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.config_path.with_suffix('.tmp')
         
-        with open(self.config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.config_path)
+    
+    async def _debounced_flush(self, delay: float):
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            # Also runs when the task is cancelled, e.g. by asyncio.run()
+            # tearing the loop down, so a pending write is never dropped
+            self._flush_task = None
+            if self._dirty:
+                self.save_custom_servers()
+    
+    async def flush(self):
+        """Write any pending changes now"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._dirty:
+            self.save_custom_servers()
     
     def add_custom_server(self, server: MCPServer):
         """Add a custom MCP server"""
         self.custom_servers[server.name] = server
-        self.save_custom_servers()
+        self._dirty = True
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to defer to; write through
+            self.save_custom_servers()
+            return
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._debounced_flush(0.1))
     
-    def get_all_servers(self) -> Dict[str, MCPServer]:
-        """Get all available servers (builtin + custom)"""
-        return {**BUILTIN_SERVERS, **self.custom_servers}
+    def get_all_servers(self) -> Mapping[str, MCPServer]:
+        """Get all available servers (builtin + custom; custom wins on name clashes)"""
+        return self._all_servers
     
     def get_server(self, name: str) -> Optional[MCPServer]:
         """Get a specific server by name"""
-        all_servers = self.get_all_servers()
-        return all_servers.get(name)
+        return self._all_servers.get(name)
+
+# None until install_fast_loop has run, then whether it found a fast loop
+_fast_loop_installed: Optional[bool] = None
+
+def install_fast_loop() -> bool:
+    """Use uvloop (or rloop) for event loops created from now on, if installed
+    
+    MCP traffic is many small stdio/HTTP round-trips, where these loops have
+    much lower per-callback overhead. Any other loop policy (an io_uring one,
+    say) can be slotted in here without touching callers. Returns whether a
+    fast loop policy is active.
+    """
+    global _fast_loop_installed
+    if _fast_loop_installed is not None:
+        return _fast_loop_installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        try:
+            import rloop
+            asyncio.set_event_loop_policy(rloop.EventLoopPolicy())
+        except ImportError:
+            _fast_loop_installed = False
+            return False
+    _fast_loop_installed = True
+    return True
 
 # Integration with existing agent system
 class MCPEnhancedAgent:
     """Agent enhanced with MCP capabilities"""
     
     def __init__(self):
+        install_fast_loop()
         self.mcp_client = MCPClient()
         self.registry = MCPRegistry()
     
     async def initialize_mcp(self, server_names: List[str]):
         """Initialize MCP with specified servers"""
-        for server_name in server_names:
-            server = self.registry.get_server(server_name)
-            if server:
-                await self.mcp_client.add_server(server)
-            else:
-                print(f"Unknown MCP server: {server_name}")
+        # Servers spawn and handshake concurrently rather than one by one
+        await asyncio.gather(
+            *(self._add_one(server_name) for server_name in server_names),
+            return_exceptions=True
+        )
+    
+    async def _add_one(self, server_name: str):
+        """Resolve a server by name and start it"""
+        server = self.registry.get_server(server_name)
+        if server:
+            await self.mcp_client.add_server(server)
+        else:
+            print(f"Unknown MCP server: {server_name}")
     
     async def execute_with_mcp(self, task: str, context: Dict[str, Any]):
         """Execute a task with MCP tool assistance"""
-        # Determine which tools might be helpful
-        available_tools = self.mcp_client.list_available_tools()
-        
         # This would integrate with your existing LLM calls
         # The LLM would see available tools and choose which to use
-        system_prompt = f"""
-You have access to the following MCP tools:
-{json.dumps(available_tools, indent=2)}
-
-Use these tools to help complete the task: {task}
-Call tools using the format: mcp_call(tool_name, arguments)
-"""
+        # (the prompt is re-rendered only when the tool catalogue changes)
+        system_prompt = self.mcp_client.render_tools_prompt(task)
         
         # Your existing agent execution logic here
         # Enhanced with MCP tool calling capabilities
         
     async def cleanup(self):
         """Cleanup MCP resources"""
+        await self.registry.flush()
         await self.mcp_client.shutdown()
\ No newline at end of file
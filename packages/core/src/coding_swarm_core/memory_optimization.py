@@ -5,21 +5,59 @@ Provides efficient resource management, garbage collection improvements, and mem
 from __future__ import annotations
 
 import gc
+import logging
+import logging.handlers
+import queue
 import weakref
 import threading
 import time
 from typing import Dict, List, Any, Optional, Callable, Set
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+from itertools import islice
 import tracemalloc
 import psutil
 import os
 import sys
 from contextlib import contextmanager
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+# Hot-path callables bound once to skip module attribute lookups per call
+_tm_take_snapshot = tracemalloc.take_snapshot
+_gc_get_count = gc.get_count
+_gc_get_stats = gc.get_stats
+_gc_get_threshold = gc.get_threshold
+_gc_collect = gc.collect
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# psutil readings hit /proc; reads within this window share one result
+_PSUTIL_TTL = 0.5  # seconds
+_vm_cache: Optional[tuple] = None
+
+
+def _virtual_memory():
+    """psutil.virtual_memory(), cached for _PSUTIL_TTL seconds"""
+    global _vm_cache
+    now = time.monotonic()
+    cached = _vm_cache
+    if cached is not None and now - cached[0] < _PSUTIL_TTL:
+        return cached[1]
+    value = psutil.virtual_memory()
+    _vm_cache = (now, value)
+    return value
+
+
+# Below this many points the array setup costs more than the Python sums
+_NUMPY_TREND_MIN = 32
+
+
+@dataclass(slots=True)
 class MemorySnapshot:
     """Memory usage snapshot"""
     timestamp: datetime
@@ -30,70 +68,194 @@ class MemorySnapshot:
     gc_stats: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryPool:
-    """Memory pool for efficient object reuse"""
-    pool: Dict[str, deque] = field(default_factory=lambda: defaultdict(deque))
+    """Memory pool for efficient object reuse
+
+    Each type gets a fixed ``max_size`` ring buffer allocated on first use,
+    so get/put never allocate.
+    """
     max_size: int = 1000
-    stats: Dict[str, int] = field(default_factory=dict)
+    stats: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    _buffers: Dict[str, List[Any]] = field(default_factory=dict, init=False, repr=False)
+    _head: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _count: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
 
     def get(self, obj_type: str) -> Optional[Any]:
         """Get object from pool"""
-        if obj_type in self.pool and self.pool[obj_type]:
-            self.stats[obj_type] = self.stats.get(obj_type, 0) + 1
-            return self.pool[obj_type].popleft()
-        return None
+        count = self._count.get(obj_type, 0)
+        if not count:
+            return None
+        buf = self._buffers[obj_type]
+        head = self._head[obj_type]
+        obj = buf[head]
+        buf[head] = None
+        self._head[obj_type] = (head + 1) % self.max_size
+        self._count[obj_type] = count - 1
+        self.stats[obj_type] += 1
+        return obj
 
     def put(self, obj_type: str, obj: Any):
         """Return object to pool"""
-        if len(self.pool[obj_type]) < self.max_size:
-            self.pool[obj_type].append(obj)
+        buf = self._buffers.get(obj_type)
+        if buf is None:
+            buf = self._buffers[obj_type] = [None] * self.max_size
+            self._head[obj_type] = 0
+            self._count[obj_type] = 0
+        count = self._count[obj_type]
+        if count < self.max_size:
+            buf[(self._head[obj_type] + count) % self.max_size] = obj
+            self._count[obj_type] = count + 1
 
     def get_stats(self) -> Dict[str, Any]:
         """Get pool statistics"""
         return {
-            'total_objects': sum(len(pool) for pool in self.pool.values()),
-            'pool_sizes': {k: len(v) for k, v in self.pool.items()},
-            'usage_stats': self.stats.copy()
+            'total_objects': sum(self._count.values()),
+            'pool_sizes': dict(self._count),
+            'usage_stats': dict(self.stats)
         }
 
+    @staticmethod
+    def register_type(obj_type: str) -> type:
+        """MemoryPool subclass specialized for ``obj_type``
+
+        The subclass keeps ``obj_type`` objects in dedicated slots, so get/put
+        for that type skip the per-type dict lookups; other types still go
+        through the generic path. Classes are cached per type.
+        """
+        specialized = _SPECIALIZED_POOLS.get(obj_type)
+        if specialized is None:
+            specialized = _SPECIALIZED_POOLS[obj_type] = _specialize_pool(obj_type)
+        return specialized
+
+
+_SPECIALIZED_POOLS: Dict[str, type] = {}
+
+
+def _specialize_pool(obj_type: str) -> type:
+    """Build the MemoryPool subclass for MemoryPool.register_type"""
+
+    def __init__(self, *args, **kwargs):
+        MemoryPool.__init__(self, *args, **kwargs)
+        self._typed_buf = [None] * self.max_size
+        self._typed_head = 0
+        self._typed_count = 0
+        self._typed_hits = 0
+
+    def get(self, requested_type: str) -> Optional[Any]:
+        if requested_type != obj_type:
+            return MemoryPool.get(self, requested_type)
+        count = self._typed_count
+        if not count:
+            return None
+        buf = self._typed_buf
+        head = self._typed_head
+        obj = buf[head]
+        buf[head] = None
+        self._typed_head = (head + 1) % self.max_size
+        self._typed_count = count - 1
+        self._typed_hits += 1
+        return obj
+
+    def put(self, requested_type: str, obj: Any):
+        if requested_type != obj_type:
+            MemoryPool.put(self, requested_type, obj)
+            return
+        count = self._typed_count
+        if count < self.max_size:
+            self._typed_buf[(self._typed_head + count) % self.max_size] = obj
+            self._typed_count = count + 1
 
-@dataclass
+    def get_stats(self) -> Dict[str, Any]:
+        stats = MemoryPool.get_stats(self)
+        stats['total_objects'] += self._typed_count
+        stats['pool_sizes'][obj_type] = self._typed_count
+        if self._typed_hits:
+            stats['usage_stats'][obj_type] = self._typed_hits
+        return stats
+
+    return type(f"PoolFor_{obj_type}", (MemoryPool,), {
+        '__slots__': ('_typed_buf', '_typed_head', '_typed_count', '_typed_hits'),
+        '__init__': __init__,
+        'get': get,
+        'put': put,
+        'get_stats': get_stats,
+    })
+
+
+@dataclass(slots=True)
 class WeakReferenceCache:
     """Cache with weak references to prevent memory leaks"""
     cache: weakref.WeakValueDictionary = field(default_factory=weakref.WeakValueDictionary)
-    access_times: Dict[str, datetime] = field(default_factory=dict)
-    max_age: timedelta = timedelta(hours=1)
+    # time.monotonic() per key, least recently accessed first
+    access_times: "OrderedDict[str, float]" = field(default_factory=OrderedDict)
+    max_age_seconds: float = 3600.0
 
     def get(self, key: str) -> Optional[Any]:
         """Get item from cache"""
-        if key in self.cache:
-            self.access_times[key] = datetime.utcnow()
-            return self.cache[key]
-        return None
+        value = self.cache.get(key)
+        if value is not None:
+            self.access_times[key] = time.monotonic()
+            self.access_times.move_to_end(key)
+        return value
 
     def put(self, key: str, value: Any):
         """Put item in cache"""
         self.cache[key] = value
-        self.access_times[key] = datetime.utcnow()
+        self.access_times[key] = time.monotonic()
+        self.access_times.move_to_end(key)
 
     def cleanup_expired(self):
         """Remove expired entries"""
-        now = datetime.utcnow()
-        expired_keys = [
-            key for key, access_time in self.access_times.items()
-            if now - access_time > self.max_age
-        ]
-        for key in expired_keys:
+        cutoff = time.monotonic() - self.max_age_seconds
+        access_times = self.access_times
+        # Oldest entries sit at the front; stop at the first one still fresh
+        while access_times and next(iter(access_times.values())) < cutoff:
+            key, _ = access_times.popitem(last=False)
             self.cache.pop(key, None)
-            self.access_times.pop(key, None)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
+        access_times = self.access_times
+        # Access order makes the ends of the map the extremes
         return {
             'size': len(self.cache),
-            'oldest_access': min(self.access_times.values()) if self.access_times else None,
-            'newest_access': max(self.access_times.values()) if self.access_times else None
+            'oldest_access': _monotonic_to_datetime(next(iter(access_times.values()))) if access_times else None,
+            'newest_access': _monotonic_to_datetime(next(reversed(access_times.values()))) if access_times else None
+        }
+
+
+def _monotonic_to_datetime(stamp: float) -> datetime:
+    """Wall-clock (UTC) time for a time.monotonic() reading, for reports"""
+    return datetime.utcnow() - timedelta(seconds=time.monotonic() - stamp)
+
+
+@dataclass(slots=True)
+class MemoryReport:
+    """Profiler report; converted to a dict only at serialization boundaries"""
+    process_mb: float
+    system_mb: float
+    percentage: float
+    trends: Dict[str, Any]
+    gc_stats: Dict[str, Any]
+    top_allocations: List[Dict[str, Any]]
+    snapshot_count: int
+    monitoring_active: bool
+    recommendations: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'current_memory': {
+                'process_mb': self.process_mb,
+                'system_mb': self.system_mb,
+                'percentage': self.percentage
+            },
+            'trends': self.trends,
+            'gc_stats': self.gc_stats,
+            'top_allocations': self.top_allocations,
+            'snapshot_count': self.snapshot_count,
+            'monitoring_active': self.monitoring_active,
+            'recommendations': self.recommendations
         }
 
 
@@ -101,11 +263,40 @@ class MemoryProfiler:
     """Advanced memory profiling and analysis"""
 
     def __init__(self):
-        self.snapshots: List[MemorySnapshot] = []
         self.tracemalloc_started = False
         self.monitoring_active = False
         self.snapshot_interval = 60  # seconds
-        self.max_snapshots = 100
+        # Bounded: appending past max_snapshots drops the oldest in O(1)
+        self.snapshots: deque[MemorySnapshot] = deque(maxlen=100)
+        # Running aggregates over the snapshots currently held: their total
+        # process memory, and a monotonic (sequence, value) queue whose
+        # front is the window maximum
+        self._sum_memory = 0
+        self._peak_queue: deque = deque()
+        self._snap_seq = 0
+        # tracemalloc snapshots are expensive; only every Nth snapshot gets one
+        self.sample_every = 10
+        self._snap_counter = 0
+        # Most recent sampled allocations; most snapshots carry none
+        self._top_allocations: List[Dict[str, Any]] = []
+        self._process = psutil.Process()
+        self._mem_info_cache: Optional[tuple] = None
+
+    @property
+    def max_snapshots(self) -> int:
+        """Number of snapshots kept; lowering it drops the oldest"""
+        return self.snapshots.maxlen
+
+    @max_snapshots.setter
+    def max_snapshots(self, value: int):
+        if value < 1:
+            raise ValueError("max_snapshots must be at least 1")
+        held = self.snapshots
+        self.snapshots = deque(maxlen=value)
+        self._sum_memory = 0
+        self._peak_queue = deque()
+        for snapshot in islice(held, max(0, len(held) - value), None):
+            self._append_snapshot(snapshot)
 
     def start_profiling(self):
         """Start memory profiling"""
@@ -122,36 +313,76 @@ class MemoryProfiler:
             tracemalloc.stop()
             self.tracemalloc_started = False
 
-    def take_snapshot(self) -> MemorySnapshot:
-        """Take a memory usage snapshot"""
-        process = psutil.Process()
-        memory_info = process.memory_info()
+    def set_tracing_enabled(self, enabled: bool):
+        """Pause or resume tracemalloc, e.g. around allocation-heavy phases"""
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.tracemalloc_started = True
+        elif not enabled and self.tracemalloc_started:
+            tracemalloc.stop()
+            self.tracemalloc_started = False
+
+    def _memory_info(self):
+        """Process memory_info(), cached for _PSUTIL_TTL seconds"""
+        now = time.monotonic()
+        cached = self._mem_info_cache
+        if cached is not None and now - cached[0] < _PSUTIL_TTL:
+            return cached[1]
+        value = self._process.memory_info()
+        self._mem_info_cache = (now, value)
+        return value
+
+    def take_snapshot(self, gc_stats: Optional[Dict[str, Any]] = None) -> MemorySnapshot:
+        """Take a memory usage snapshot
+
+        ``gc_stats`` lets a caller that has just read the GC counters pass
+        them in instead of having them read again.
+        """
+        memory_info = self._memory_info()
+        virtual_memory = _virtual_memory()
 
         snapshot = MemorySnapshot(
             timestamp=datetime.utcnow(),
             process_memory=memory_info.rss,
-            system_memory=psutil.virtual_memory().used,
-            memory_percent=process.memory_percent(),
-            gc_stats=self._get_gc_stats()
+            system_memory=virtual_memory.used,
+            memory_percent=memory_info.rss / virtual_memory.total * 100,
+            gc_stats=gc_stats if gc_stats is not None else self._get_gc_stats()
         )
 
-        # Get top memory allocations if tracemalloc is active
-        if self.tracemalloc_started:
-            snapshot.top_allocations = self._get_top_allocations()
+        # Get top memory allocations if tracemalloc is active (sampled)
+        if self.tracemalloc_started and self._snap_counter % self.sample_every == 0:
+            snapshot.top_allocations = self._top_allocations = self._get_top_allocations()
+        self._snap_counter += 1
 
-        self.snapshots.append(snapshot)
-
-        # Keep only recent snapshots
-        if len(self.snapshots) > self.max_snapshots:
-            self.snapshots = self.snapshots[-self.max_snapshots:]
+        self._append_snapshot(snapshot)
 
         return snapshot
 
+    def _append_snapshot(self, snapshot: MemorySnapshot):
+        """Append a snapshot, keeping the running sum and peak in step"""
+        snapshots = self.snapshots
+        if len(snapshots) == snapshots.maxlen:
+            self._sum_memory -= snapshots[0].process_memory
+        snapshots.append(snapshot)
+
+        value = snapshot.process_memory
+        self._sum_memory += value
+        seq = self._snap_seq
+        self._snap_seq = seq + 1
+
+        peak_queue = self._peak_queue
+        while peak_queue and peak_queue[-1][1] <= value:
+            peak_queue.pop()
+        peak_queue.append((seq, value))
+        oldest_seq = seq - len(snapshots) + 1
+        while peak_queue[0][0] < oldest_seq:
+            peak_queue.popleft()
+
     def _get_top_allocations(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get top memory allocations"""
         try:
-            stats = tracemalloc.take_snapshot()
-            top_stats = stats.statistics('lineno')[:limit]
+            stats = _tm_take_snapshot()
+            top_stats = stats.statistics('filename')[:limit]
 
             return [
                 {
@@ -168,9 +399,9 @@ class MemoryProfiler:
     def _get_gc_stats(self) -> Dict[str, Any]:
         """Get garbage collection statistics"""
         return {
-            'collections': gc.get_count(),
-            'objects': gc.get_stats(),
-            'threshold': gc.get_threshold()
+            'collections': _gc_get_count(),
+            'objects': _gc_get_stats(),
+            'threshold': _gc_get_threshold()
         }
 
     def analyze_memory_trends(self) -> Dict[str, Any]:
@@ -178,30 +409,30 @@ class MemoryProfiler:
         if len(self.snapshots) < 2:
             return {'error': 'Insufficient data for trend analysis'}
 
-        memory_values = [s.process_memory for s in self.snapshots]
-        timestamps = [s.timestamp for s in self.snapshots]
+        snapshots = self.snapshots
+        first, last = snapshots[0], snapshots[-1]
 
         # Calculate trends
-        if len(memory_values) >= 2:
-            memory_increase = memory_values[-1] - memory_values[0]
-            time_span = (timestamps[-1] - timestamps[0]).total_seconds()
-            memory_rate = memory_increase / time_span if time_span > 0 else 0
-
-            # Detect memory leaks (sustained increase)
-            recent_trend = self._calculate_recent_trend(memory_values, 10)
-
-            return {
-                'total_memory_increase': memory_increase,
-                'memory_increase_rate': memory_rate,  # bytes per second
-                'current_memory_usage': memory_values[-1],
-                'peak_memory_usage': max(memory_values),
-                'average_memory_usage': sum(memory_values) / len(memory_values),
-                'memory_leak_detected': recent_trend > 1000,  # 1KB/s increase
-                'trend_direction': 'increasing' if recent_trend > 0 else 'decreasing',
-                'snapshot_count': len(self.snapshots)
-            }
+        memory_increase = last.process_memory - first.process_memory
+        time_span = (last.timestamp - first.timestamp).total_seconds()
+        memory_rate = memory_increase / time_span if time_span > 0 else 0
 
-        return {'error': 'Unable to calculate trends'}
+        # Detect memory leaks (sustained increase); only the window is materialized
+        window = 10
+        recent = [s.process_memory for s in islice(reversed(snapshots), window)]
+        recent.reverse()
+        recent_trend = self._calculate_recent_trend(recent, window)
+
+        return {
+            'total_memory_increase': memory_increase,
+            'memory_increase_rate': memory_rate,  # bytes per second
+            'current_memory_usage': last.process_memory,
+            'peak_memory_usage': self._peak_queue[0][1],
+            'average_memory_usage': self._sum_memory / len(snapshots),
+            'memory_leak_detected': recent_trend > _LEAK_RATE_THRESHOLD,
+            'trend_direction': 'increasing' if recent_trend > 0 else 'decreasing',
+            'snapshot_count': len(snapshots)
+        }
 
     def _calculate_recent_trend(self, values: List[int], window: int = 10) -> float:
         """Calculate recent trend in values"""
@@ -209,65 +440,92 @@ class MemoryProfiler:
             window = len(values)
 
         recent = values[-window:]
-        if len(recent) < 2:
-            return 0
-
-        # Simple linear regression slope
         n = len(recent)
-        x = list(range(n))
-        y = recent
+        if n < 2:
+            return 0
 
-        sum_x = sum(x)
-        sum_y = sum(y)
-        sum_xy = sum(xi * yi for xi, yi in zip(x, y))
-        sum_xx = sum(xi * xi for xi in x)
+        # Least-squares slope against x = 0..n-1
+        if np is not None and n >= _NUMPY_TREND_MIN:
+            y = np.asarray(recent, dtype=np.float64)
+            x = np.arange(n, dtype=np.float64)
+            x -= x.mean()
+            return float((x * y).sum() / (x * x).sum())
 
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x) if (n * sum_xx - sum_x * sum_x) != 0 else 0
+        # The x sums have closed forms, leaving a single pass over y
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        sum_y = sum(recent)
+        sum_xy = sum(i * yi for i, yi in enumerate(recent))
 
-        return slope
+        return (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
 
-    def get_memory_report(self) -> Dict[str, Any]:
-        """Generate comprehensive memory report"""
+    def get_memory_report(self) -> Optional[MemoryReport]:
+        """Generate comprehensive memory report (None before the first snapshot)"""
         if not self.snapshots:
-            return {'error': 'No memory snapshots available'}
+            return None
 
         latest = self.snapshots[-1]
         trends = self.analyze_memory_trends()
 
-        return {
-            'current_memory': {
-                'process_mb': latest.process_memory / 1024 / 1024,
-                'system_mb': latest.system_memory / 1024 / 1024,
-                'percentage': latest.memory_percent
-            },
-            'trends': trends,
-            'gc_stats': latest.gc_stats,
-            'top_allocations': latest.top_allocations,
-            'snapshot_count': len(self.snapshots),
-            'monitoring_active': self.monitoring_active,
-            'recommendations': self._generate_memory_recommendations(trends)
-        }
+        return MemoryReport(
+            process_mb=latest.process_memory / 1024 / 1024,
+            system_mb=latest.system_memory / 1024 / 1024,
+            percentage=latest.memory_percent,
+            trends=trends,
+            gc_stats=latest.gc_stats,
+            top_allocations=self._top_allocations,
+            snapshot_count=len(self.snapshots),
+            monitoring_active=self.monitoring_active,
+            recommendations=self._generate_memory_recommendations(trends)
+        )
 
     def _generate_memory_recommendations(self, trends: Dict[str, Any]) -> List[str]:
         """Generate memory optimization recommendations"""
-        recommendations = []
-
-        if trends.get('memory_leak_detected', False):
-            recommendations.append("Memory leak detected - review object lifecycle management")
-            recommendations.append("Consider implementing weak references for cached objects")
-            recommendations.append("Review circular references that may prevent garbage collection")
-
-        memory_rate = trends.get('memory_increase_rate', 0)
-        if memory_rate > 50000:  # 50KB/s
-            recommendations.append("High memory allocation rate - consider object pooling")
-            recommendations.append("Review frequent object creation patterns")
+        return [
+            message
+            for applies, messages in _RECOMMENDATION_RULES
+            if applies(trends)
+            for message in messages
+        ]
 
-        current_mb = trends.get('current_memory_usage', 0) / 1024 / 1024
-        if current_mb > 500:  # 500MB
-            recommendations.append("High memory usage - consider memory optimization techniques")
-            recommendations.append("Review large data structures and caching strategies")
 
-        return recommendations
+_LEAK_RATE_THRESHOLD = 1000            # bytes/s of recent growth that counts as a leak
+_HIGH_ALLOCATION_RATE = 50000          # 50KB/s
+_HIGH_MEMORY_BYTES = 500 * 1024 * 1024  # 500MB
+
+# (predicate over analyze_memory_trends() output, recommendations it triggers)
+_RECOMMENDATION_RULES = (
+    (
+        lambda trends: trends.get('memory_leak_detected', False),
+        (
+            "Memory leak detected - review object lifecycle management",
+            "Consider implementing weak references for cached objects",
+            "Review circular references that may prevent garbage collection",
+        ),
+    ),
+    (
+        lambda trends: trends.get('memory_increase_rate', 0) > _HIGH_ALLOCATION_RATE,
+        (
+            "High memory allocation rate - consider object pooling",
+            "Review frequent object creation patterns",
+        ),
+    ),
+    (
+        lambda trends: trends.get('current_memory_usage', 0) > _HIGH_MEMORY_BYTES,
+        (
+            "High memory usage - consider memory optimization techniques",
+            "Review large data structures and caching strategies",
+        ),
+    ),
+)
+
+
+# Memory growth rates (bytes/s) and the GC thresholds chosen for them
+_GC_AGGRESSIVE_RATE = 1_000_000
+_GC_RELAXED_RATE = 10_000
+_GC_AGGRESSIVE_THRESHOLDS = (500, 10, 10)
+_GC_DEFAULT_THRESHOLDS = (700, 10, 10)
+_GC_RELAXED_THRESHOLDS = (2000, 20, 20)
 
 
 class GarbageCollectionOptimizer:
@@ -276,16 +534,34 @@ class GarbageCollectionOptimizer:
     def __init__(self):
         self.gc_disabled = False
         self.custom_cleanup_callbacks: List[Callable] = []
-        self.object_registry: weakref.WeakSet = weakref.WeakSet()
+        # id(obj) -> weak reference, removed by the reference's own callback
+        self.object_registry: Dict[int, weakref.ref] = {}
 
     def optimize_gc_settings(self):
         """Optimize garbage collection settings"""
         # Set more aggressive GC thresholds for better memory management
-        gc.set_threshold(700, 10, 10)  # More frequent collections
+        gc.set_threshold(*_GC_DEFAULT_THRESHOLDS)  # Retuned from trends while monitoring
 
         # Disable automatic GC if needed for performance-critical sections
         self.gc_disabled = False
 
+    def tune_gc_from_trends(self, trends: Dict[str, Any]) -> tuple:
+        """Adapt GC thresholds to the observed memory growth rate
+
+        Fast growth (a likely leak) gets more frequent collections; a quiet
+        heap gets fewer, cutting needless full walks.
+        """
+        rate = trends.get('memory_increase_rate', 0)
+        if rate > _GC_AGGRESSIVE_RATE:
+            thresholds = _GC_AGGRESSIVE_THRESHOLDS
+        elif rate < _GC_RELAXED_RATE:
+            thresholds = _GC_RELAXED_THRESHOLDS
+        else:
+            thresholds = _GC_DEFAULT_THRESHOLDS
+        if _gc_get_threshold() != thresholds:
+            gc.set_threshold(*thresholds)
+        return thresholds
+
     @contextmanager
     def disable_gc_temporarily(self):
         """Context manager to temporarily disable GC"""
@@ -297,8 +573,8 @@ class GarbageCollectionOptimizer:
         finally:
             if was_enabled:
                 gc.enable()
-                # Force a collection after re-enabling
-                gc.collect()
+                # Garbage from the burst is young; a gen-0 pass is enough
+                gc.collect(0)
 
     def register_cleanup_callback(self, callback: Callable):
         """Register a cleanup callback"""
@@ -306,14 +582,14 @@ class GarbageCollectionOptimizer:
 
     def perform_optimized_collection(self, generation: int = 2) -> Dict[str, Any]:
         """Perform optimized garbage collection"""
-        before = gc.get_count()
-        before_stats = gc.get_stats()
+        before = _gc_get_count()
+        before_stats = _gc_get_stats()
 
         # Collect specific generation
-        collected = gc.collect(generation)
+        collected = _gc_collect(generation)
 
-        after = gc.get_count()
-        after_stats = gc.get_stats()
+        after = _gc_get_count()
+        after_stats = _gc_get_stats()
 
         return {
             'collected_objects': collected,
@@ -324,42 +600,64 @@ class GarbageCollectionOptimizer:
             'efficiency': collected / max(before[generation], 1)
         }
 
+    def force_full_collect(self) -> int:
+        """Run a full (generation 2) collection for callers that need one"""
+        return gc.collect()
+
     def cleanup_weak_references(self):
         """Clean up weak references"""
-        # Force cleanup of weak references
-        gc.collect()
+        # Weak references are cleared as soon as their referent dies, so no
+        # collection is needed here; use force_full_collect() for cycles
 
         # Call custom cleanup callbacks
         for callback in self.custom_cleanup_callbacks:
             try:
                 callback()
-            except Exception as e:
-                print(f"Error in cleanup callback: {e}")
+            except Exception:
+                logger.exception("Error in cleanup callback")
 
     def monitor_object_lifecycle(self, obj: Any, name: str = None):
         """Monitor object lifecycle using weak references"""
+        key = id(obj)
+
         def cleanup_callback(ref):
-            print(f"Object {name or 'unknown'} was garbage collected")
+            if self.object_registry.get(key) is ref:
+                del self.object_registry[key]
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Object %s was garbage collected", name or 'unknown')
 
         weak_ref = weakref.ref(obj, cleanup_callback)
-        self.object_registry.add(weak_ref)
+        self.object_registry[key] = weak_ref
 
         return weak_ref
 
 
+_LOCK_STRIPES = 64  # power of two
+
+
 class ResourceManager:
     """Efficient resource management system"""
 
     def __init__(self):
         self.resources: Dict[str, Any] = {}
-        self.resource_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        # Striped locks, picked by hash(resource_id), guard only the lookup of
+        # the per-resource lock; each resource's own lock is what callers hold
+        # and it disappears once no caller references it
+        self._lock_stripes = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._resource_locks: weakref.WeakValueDictionary[str, threading.RLock] = weakref.WeakValueDictionary()
         self.resource_usage: Dict[str, Dict[str, Any]] = defaultdict(dict)
         self.cleanup_callbacks: Dict[str, List[Callable]] = defaultdict(list)
+        # release_count - acquire_count per resource, kept for the cleanup check
+        self._net_releases: Dict[str, int] = {}
 
     @contextmanager
     def acquire_resource(self, resource_id: str, resource_type: str = 'generic'):
-        """Context manager for resource acquisition"""
-        lock = self.resource_locks[resource_id]
+        """Context manager for resource acquisition
+
+        Only callers of the same resource_id wait on each other, and a thread
+        may re-acquire a resource it already holds.
+        """
+        lock = self._resource_lock(resource_id)
 
         with lock:
             start_time = time.time()
@@ -377,6 +675,14 @@ class ResourceManager:
                 if self._should_cleanup_resource(resource_id):
                     self._cleanup_resource(resource_id)
 
+    def _resource_lock(self, resource_id: str) -> threading.RLock:
+        """Get or create the lock for one resource"""
+        with self._lock_stripes[hash(resource_id) & (_LOCK_STRIPES - 1)]:
+            lock = self._resource_locks.get(resource_id)
+            if lock is None:
+                lock = self._resource_locks[resource_id] = threading.RLock()
+            return lock
+
     def register_resource(self, resource_id: str, resource: Any, cleanup_callback: Optional[Callable] = None):
         """Register a resource for management"""
         self.resources[resource_id] = resource
@@ -428,6 +734,9 @@ class ResourceManager:
             }
 
         usage = self.resource_usage[resource_id]
+        self._net_releases[resource_id] = (
+            self._net_releases.get(resource_id, 0) + (1 if action == 'release' else -1)
+        )
 
         if action == 'acquire':
             usage['acquire_count'] += 1
@@ -438,12 +747,8 @@ class ResourceManager:
 
     def _should_cleanup_resource(self, resource_id: str) -> bool:
         """Determine if resource should be cleaned up"""
-        usage = self.resource_usage.get(resource_id, {})
-        acquire_count = usage.get('acquire_count', 0)
-        release_count = usage.get('release_count', 0)
-
         # Cleanup if resource has been released more than acquired (indicates overuse)
-        return release_count > acquire_count + 5
+        return self._net_releases.get(resource_id, 0) > 5
 
     def _cleanup_resource(self, resource_id: str):
         """Clean up a resource"""
@@ -451,14 +756,73 @@ class ResourceManager:
         for callback in self.cleanup_callbacks.get(resource_id, []):
             try:
                 callback(self.resources[resource_id])
-            except Exception as e:
-                print(f"Error in cleanup callback for {resource_id}: {e}")
+            except Exception:
+                logger.exception("Error in cleanup callback for %s", resource_id)
 
         # Remove from tracking
         if resource_id in self.resources:
             del self.resources[resource_id]
 
 
+class _DeferToListener(logging.Filter):
+    """Logger filter that queues records for the listener thread and drops
+    them from the calling thread's synchronous handler chain"""
+
+    def __init__(self, log_queue: queue.SimpleQueue):
+        super().__init__()
+        self._queue = log_queue
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Merge args now; they may be mutated before the listener runs
+        record.msg = record.getMessage()
+        record.args = None
+        self._queue.put_nowait(record)
+        return False
+
+
+class _EmitThroughHierarchy(logging.Handler):
+    """Listener-side handler that runs the usual handler chain for a record
+
+    Handlers are looked up when the record is emitted, so parent-logger
+    handlers and ones added to the root logger later are all honoured,
+    with propagation left as configured.
+    """
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        logger.callHandlers(record)
+        return True
+
+
+# One listener thread per process, shared by every MemoryOptimizer that is
+# running and removed when the last one stops
+_log_lock = threading.Lock()
+_log_users = 0
+_log_listener: Optional[logging.handlers.QueueListener] = None
+_log_filter: Optional[_DeferToListener] = None
+
+
+def _acquire_log_listener():
+    global _log_users, _log_listener, _log_filter
+    with _log_lock:
+        _log_users += 1
+        if _log_listener is None:
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            _log_listener = logging.handlers.QueueListener(log_queue, _EmitThroughHierarchy())
+            _log_filter = _DeferToListener(log_queue)
+            _log_listener.start()
+            logger.addFilter(_log_filter)
+
+
+def _release_log_listener():
+    global _log_users, _log_listener, _log_filter
+    with _log_lock:
+        _log_users -= 1
+        if _log_users == 0 and _log_listener is not None:
+            logger.removeFilter(_log_filter)
+            _log_listener.stop()  # Emits anything still queued
+            _log_listener = _log_filter = None
+
+
 class MemoryOptimizer:
     """Main memory optimization coordinator"""
 
@@ -469,12 +833,19 @@ class MemoryOptimizer:
         self.object_pool = MemoryPool()
         self.cache = WeakReferenceCache()
         self.monitoring_active = False
+        self.optimize_interval = 300  # seconds
+        # Set by stop_optimization to wake the monitoring thread immediately
+        self._stop_event = threading.Event()
+        # Whether this optimizer holds a reference on the shared log listener
+        self._queue_logging = False
 
     def start_optimization(self):
         """Start memory optimization"""
         self.profiler.start_profiling()
         self.gc_optimizer.optimize_gc_settings()
         self.monitoring_active = True
+        self._stop_event.clear()
+        self._start_queue_logging()
 
         # Start background monitoring
         threading.Thread(target=self._background_monitoring, daemon=True).start()
@@ -482,23 +853,40 @@ class MemoryOptimizer:
     def stop_optimization(self):
         """Stop memory optimization"""
         self.monitoring_active = False
+        self._stop_event.set()
         self.profiler.stop_profiling()
+        self._stop_queue_logging()
+
+    def _start_queue_logging(self):
+        """Emit this module's log records on the shared listener thread,
+        so the monitoring thread never blocks on handler I/O"""
+        if not self._queue_logging:
+            _acquire_log_listener()
+            self._queue_logging = True
+
+    def _stop_queue_logging(self):
+        if self._queue_logging:
+            self._queue_logging = False
+            _release_log_listener()
 
     def optimize_memory_usage(self) -> Dict[str, Any]:
         """Perform comprehensive memory optimization"""
-        results = {
-            'gc_collection': self.gc_optimizer.perform_optimized_collection(),
-            'memory_snapshot': self.profiler.take_snapshot(),
+        # One full collection; the snapshot reuses its post-collection counters
+        collection = self.gc_optimizer.perform_optimized_collection()
+        gc_stats = {
+            'collections': collection['collections_after'],
+            'objects': collection['stats_after'],
+            'threshold': _gc_get_threshold()
+        }
+
+        return {
+            'gc_collection': collection,
+            'memory_snapshot': self.profiler.take_snapshot(gc_stats),
             'cache_cleanup': self._cleanup_cache(),
             'pool_stats': self.object_pool.get_stats(),
             'resource_stats': self.resource_manager.get_resource_stats()
         }
 
-        # Force garbage collection
-        gc.collect()
-
-        return results
-
     def _cleanup_cache(self) -> Dict[str, Any]:
         """Clean up cache and return statistics"""
         before_size = len(self.cache.cache)
@@ -513,25 +901,40 @@ class MemoryOptimizer:
 
     def _background_monitoring(self):
         """Background memory monitoring"""
+        _monotonic = time.monotonic
+        _wait = self._stop_event.wait
+        take_snapshot = self.profiler.take_snapshot
+        analyze_trends = self.profiler.analyze_memory_trends
+        tune_gc = self.gc_optimizer.tune_gc_from_trends
+
+        next_optimize = _monotonic() + self.optimize_interval
         while self.monitoring_active:
             try:
                 # Take memory snapshot
-                self.profiler.take_snapshot()
+                take_snapshot()
+
+                # Retune GC thresholds to the current growth rate
+                trends = analyze_trends()
+                if 'error' not in trends:
+                    tune_gc(trends)
 
                 # Periodic cleanup
-                if time.time() % 300 < 1:  # Every 5 minutes
+                if _monotonic() >= next_optimize:
                     self.optimize_memory_usage()
+                    next_optimize += self.optimize_interval
 
-                time.sleep(self.profiler.snapshot_interval)
+                _wait(self.profiler.snapshot_interval)
 
-            except Exception as e:
-                print(f"Error in background monitoring: {e}")
-                time.sleep(60)
+            except Exception:
+                logger.exception("Error in background monitoring")
+                _wait(60)
 
     def get_memory_status(self) -> Dict[str, Any]:
         """Get comprehensive memory status"""
+        virtual_memory = _virtual_memory()
+        report = self.profiler.get_memory_report()
         return {
-            'profiler_report': self.profiler.get_memory_report(),
+            'profiler_report': report.to_dict() if report else {'error': 'No memory snapshots available'},
             'gc_optimizer_status': {
                 'gc_disabled': self.gc_optimizer.gc_disabled,
                 'cleanup_callbacks': len(self.gc_optimizer.custom_cleanup_callbacks),
@@ -547,10 +950,10 @@ class MemoryOptimizer:
             'object_pool_status': self.object_pool.get_stats(),
             'cache_status': self.cache.get_stats(),
             'system_memory': {
-                'total': psutil.virtual_memory().total,
-                'available': psutil.virtual_memory().available,
-                'used': psutil.virtual_memory().used,
-                'percentage': psutil.virtual_memory().percent
+                'total': virtual_memory.total,
+                'available': virtual_memory.available,
+                'used': virtual_memory.used,
+                'percentage': virtual_memory.percent
             }
         }
 
@@ -567,7 +970,7 @@ def get_memory_optimizer() -> MemoryOptimizer:
 # Utility functions for memory-efficient operations
 def create_large_object_pool(obj_type: str, factory_func: Callable, pool_size: int = 100):
     """Create a pool for large objects to reduce allocation overhead"""
-    pool = MemoryPool(max_size=pool_size)
+    pool = MemoryPool.register_type(obj_type)(max_size=pool_size)
 
     # Pre-populate pool
     for _ in range(pool_size // 2):
@@ -612,5 +1015,5 @@ def memory_efficient_context():
     finally:
         if gc_disabled:
             gc.enable()
-            # Force collection after re-enabling
-            gc.collect()
\ No newline at end of file
+            # Collect the young generation after re-enabling
+            gc.collect(0)
\ No newline at end of file
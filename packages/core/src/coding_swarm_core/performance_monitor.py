@@ -5,18 +5,43 @@ Provides real-time monitoring, alerting, and predictive analytics
 from __future__ import annotations
 
 import asyncio
+import bisect
+import logging
+import math
+import operator
+import os
+import struct
 import time
 import psutil
 import threading
 from typing import Dict, List, Any, Optional, Callable, Tuple
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from dataclasses import asdict, dataclass, field, is_dataclass
+from datetime import datetime, timezone
 from enum import Enum
-from collections import defaultdict, deque
+from collections import defaultdict
 import statistics
 import json
+from array import array
 from pathlib import Path
 
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:
+    np = None
+
+try:
+    from crick import TDigest
+except ImportError:
+    TDigest = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
 
 class MetricType(Enum):
     COUNTER = "counter"
@@ -39,7 +64,7 @@ class Metric:
     type: MetricType
     value: float
     labels: Dict[str, str] = field(default_factory=dict)
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp: float = field(default_factory=time.time)  # POSIX seconds
     description: str = ""
 
 
@@ -54,9 +79,9 @@ class Alert:
     threshold: float
     current_value: float
     condition: str  # 'above', 'below', 'equals'
-    timestamp: datetime
+    timestamp: float  # POSIX seconds
     resolved: bool = False
-    resolved_at: Optional[datetime] = None
+    resolved_at: Optional[float] = None
 
 
 @dataclass
@@ -71,156 +96,620 @@ class SystemHealth:
     response_time_avg: float
     error_rate: float
     uptime: float
-    last_updated: datetime
+    last_updated: float  # POSIX seconds
+
+
+@dataclass(slots=True)
+class _RunningStats:
+    """Running aggregates over a metric's retained samples, updated in O(1)"""
+    count: int = 0
+    sum: float = 0.0
+    sum_sq: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    latest: float = 0.0
+    extremes_stale: bool = False
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.sum_sq += value * value
+        self.latest = value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def remove(self, value: float):
+        """Drop an evicted sample; extremes are recomputed lazily if it was one"""
+        self.count -= 1
+        self.sum -= value
+        self.sum_sq -= value * value
+        if value <= self.min or value >= self.max:
+            self.extremes_stale = True
+
+    def refresh_extremes(self, values):
+        self.min = float(min(values, default=math.inf))
+        self.max = float(max(values, default=-math.inf))
+        self.extremes_stale = False
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def stddev(self) -> float:
+        if self.count < 2:
+            return 0.0
+        mean = self.sum / self.count
+        return math.sqrt(max(0.0, self.sum_sq / self.count - mean * mean))
+
+
+@dataclass(slots=True)
+class _RegressionSums:
+    """Running least-squares sums over (hours since origin, value) points"""
+    origin: float
+    n: int = 0
+    sx: float = 0.0
+    sy: float = 0.0
+    sxx: float = 0.0
+    sxy: float = 0.0
+    syy: float = 0.0
+    removals: int = 0
+
+    def add(self, timestamp: float, y: float):
+        x = (timestamp - self.origin) / 3600
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+        self.syy += y * y
+
+    def remove(self, timestamp: float, y: float):
+        x = (timestamp - self.origin) / 3600
+        self.n -= 1
+        self.sx -= x
+        self.sy -= y
+        self.sxx -= x * x
+        self.sxy -= x * y
+        self.syy -= y * y
+        self.removals += 1
+
+    def rebuild(self, timestamps, values):
+        """Recompute from scratch against a fresh origin, shedding rounding drift"""
+        self.origin = timestamps[0] if timestamps else self.origin
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+        self.removals = 0
+        for timestamp, y in zip(timestamps, values):
+            self.add(timestamp, y)
+
+
+class _AtomicCounter:
+    """Monotonic counter; writers serialise on a private lock, reads are lock-free"""
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def add(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+
+class _RingSeries:
+    """Fixed-capacity circular buffer of (timestamp, value, label id) columns for one gauge
+
+    Backed by NumPy arrays when available, array.array otherwise.
+    """
+    __slots__ = ('vals', 'ts', 'lids', 'head', 'n', 'cap')
+
+    def __init__(self, cap: int):
+        if np is not None:
+            self.vals = np.zeros(cap, dtype=np.float64)
+            self.ts = np.zeros(cap, dtype=np.float64)
+            self.lids = np.zeros(cap, dtype=np.uint32)
+        else:
+            self.vals = array('d', bytes(8 * cap))
+            self.ts = array('d', bytes(8 * cap))
+            self.lids = array('I', bytes(array('I').itemsize * cap))
+        self.head = 0
+        self.n = 0
+        self.cap = cap
+
+    def append(self, value: float, timestamp: float, label_id: int = 0) -> Optional[float]:
+        """Store a sample, returning the value it evicted (if the ring was full)"""
+        i = self.head
+        evicted = float(self.vals[i]) if self.n == self.cap else None
+        self.vals[i] = value
+        self.ts[i] = timestamp
+        self.lids[i] = label_id
+        self.head = (i + 1) % self.cap
+        if self.n < self.cap:
+            self.n += 1
+        return evicted
+
+    def latest_label_id(self) -> int:
+        return int(self.lids[self.head - 1])
+
+    def oldest_timestamp(self) -> float:
+        return float(self.ts[(self.head - self.n) % self.cap])
+
+    def latest_timestamp(self) -> float:
+        return float(self.ts[self.head - 1])
+
+    def filled(self):
+        """All retained values, in storage rather than time order"""
+        return self.vals[:self.n]
+
+    def _since(self, cutoff: float) -> Tuple[int, int]:
+        """(first physical index, count) of the samples recorded after ``cutoff``"""
+        n, cap, ts = self.n, self.cap, self.ts
+        start = self.head - n
+        # Timestamps are monotonic in logical order, so bisect over positions
+        skip = bisect.bisect_right(range(n), cutoff, key=lambda i: ts[(start + i) % cap])
+        return (start + skip) % cap, n - skip
+
+    def _take(self, column, first: int, count: int):
+        if first + count <= self.cap:
+            return column[first:first + count]
+        if np is not None:
+            return np.concatenate((column[first:], column[:self.head]))
+        return column[first:] + column[:self.head]
+
+    def window(self, cutoff: float):
+        """Values recorded after ``cutoff``, oldest first"""
+        first, count = self._since(cutoff)
+        return self._take(self.vals, first, count)
+
+    def columns_since(self, cutoff: float):
+        """(timestamps, values) recorded after ``cutoff``, oldest first"""
+        first, count = self._since(cutoff)
+        return self._take(self.ts, first, count), self._take(self.vals, first, count)
+
+
+def _window_stats(values) -> Tuple[float, float, float, float]:
+    """(latest, min, max, mean) of a non-empty window"""
+    if np is not None:
+        return float(values[-1]), float(values.min()), float(values.max()), float(values.mean())
+    return values[-1], min(values), max(values), math.fsum(values) / len(values)
+
+
+def _rolling_zscore(values, window_size, threshold):
+    """Trailing-window z-score scan in plain loops, written to be Numba-compilable
+
+    Returns parallel arrays (index, mean, stddev, z) for points whose z-score
+    against the preceding ``window_size`` points exceeds ``threshold``.
+    """
+    n = values.shape[0]
+    hit_index = np.empty(n, dtype=np.int64)
+    hit_mean = np.empty(n, dtype=np.float64)
+    hit_stddev = np.empty(n, dtype=np.float64)
+    hit_z = np.empty(n, dtype=np.float64)
+    hits = 0
+    for i in range(window_size, n):
+        total = 0.0
+        for j in range(i - window_size, i):
+            total += values[j]
+        mean = total / window_size
+        squares = 0.0
+        for j in range(i - window_size, i):
+            squares += (values[j] - mean) * (values[j] - mean)
+        stddev = math.sqrt(squares / (window_size - 1))
+        if stddev > 0:
+            z = abs(values[i] - mean) / stddev
+            if z > threshold:
+                hit_index[hits] = i
+                hit_mean[hits] = mean
+                hit_stddev[hits] = stddev
+                hit_z[hits] = z
+                hits += 1
+    return hit_index[:hits], hit_mean[:hits], hit_stddev[:hits], hit_z[:hits]
+
+
+_jit_rolling_zscore: Optional[Callable] = None
+_jit_checked = False
+
+
+def _get_jit_rolling_zscore() -> Optional[Callable]:
+    """The Numba-compiled _rolling_zscore, or None if numba is not installed
+
+    numba is imported on first use rather than at module import, since
+    importing it takes far longer than a monitoring tick.
+    """
+    global _jit_rolling_zscore, _jit_checked
+    if not _jit_checked:
+        _jit_checked = True
+        if np is not None:
+            try:
+                import numba
+            except ImportError:
+                pass
+            else:
+                _jit_rolling_zscore = numba.njit(cache=True, fastmath=True)(_rolling_zscore)
+    return _jit_rolling_zscore
+
+
+_SERIES_CAPACITY = 1000
+_API_TABLE_INITIAL = 1024
+# Raw points kept per metric for the order-sensitive trend/anomaly passes
+_HISTORY_WINDOW = 200
+_PERCENTILES = (0.5, 0.95, 0.99)
+# Evictions after which a series' regression sums are recomputed exactly
+_REGRESSION_REBUILD_EVERY = 4096
+_METRIC_SHARDS = 16  # power of two
+_MB = 1024 * 1024
+
+_METRIC_DESCRIPTIONS: Dict[str, str] = {
+    'system.cpu.usage': 'System CPU usage percentage',
+    'system.memory.usage': 'System memory usage percentage',
+    'system.memory.used': 'System memory used',
+    'system.disk.usage': 'System disk usage percentage',
+    'system.network.bytes_sent': 'Network bytes sent',
+    'system.network.bytes_recv': 'Network bytes received',
+    'process.cpu.usage': 'Process CPU usage percentage',
+    'process.memory.rss': 'Process resident set size memory',
+    'api.request.count': 'Total API requests',
+    'api.request.duration': 'API request duration',
+    'api.error.count': 'API error count',
+    'api.error.rate': 'API errors as a percentage of requests',
+    'agent.task.count': 'Agent task count',
+    'agent.task.duration': 'Agent task duration'
+}
+
+
+class _ProcReader:
+    """Linux /proc reader that keeps its files open across collection ticks
+
+    Each tick is one pread per file. CPU percentages come from counter deltas
+    between ticks, so nothing blocks the way cpu_percent(interval=1) did.
+    """
+    PATHS = ('/proc/stat', '/proc/meminfo', '/proc/self/stat', '/proc/self/statm', '/proc/net/dev')
+
+    def __init__(self):
+        self._fds = [os.open(path, os.O_RDONLY) for path in self.PATHS]
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+        self._clock_ticks = os.sysconf('SC_CLK_TCK')
+        self._last_cpu = self._cpu_times()
+        self._last_proc = (self._process_ticks(), time.monotonic())
+
+    @classmethod
+    def available(cls) -> bool:
+        return all(os.access(path, os.R_OK) for path in cls.PATHS)
+
+    def close(self):
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+    def _read(self, index: int) -> bytes:
+        return os.pread(self._fds[index], 65536, 0)
+
+    def _cpu_times(self) -> Tuple[int, int]:
+        """(busy, total) jiffies from the aggregate cpu line of /proc/stat"""
+        buf = self._read(0)
+        # user nice system idle iowait irq softirq steal (guest is inside user)
+        fields = [int(f) for f in buf[:buf.index(b'\n')].split()[1:9]]
+        total = sum(fields)
+        return total - fields[3] - fields[4], total
+
+    def _process_ticks(self) -> int:
+        buf = self._read(2)
+        # Skip past "pid (comm)"; comm may itself contain spaces
+        fields = buf[buf.rindex(b')') + 2:].split()
+        return int(fields[11]) + int(fields[12])  # utime + stime
+
+    def read(self) -> List[Tuple[str, float, str]]:
+        """One (metric name, value, unit) triple per system metric"""
+        busy, total = self._cpu_times()
+        last_busy, last_total = self._last_cpu
+        self._last_cpu = (busy, total)
+        cpu_percent = 100.0 * (busy - last_busy) / (total - last_total) if total > last_total else 0.0
+
+        meminfo = {}
+        for line in self._read(1).splitlines():
+            key, _, rest = line.partition(b':')
+            if key in (b'MemTotal', b'MemAvailable'):
+                meminfo[key] = int(rest.split()[0]) * 1024
+                if len(meminfo) == 2:
+                    break
+        mem_total = meminfo[b'MemTotal']
+        mem_used = mem_total - meminfo.get(b'MemAvailable', 0)
+
+        disk = os.statvfs('/')
+        disk_used = (disk.f_blocks - disk.f_bfree) * disk.f_frsize
+        disk_total = disk_used + disk.f_bavail * disk.f_frsize
+
+        bytes_recv = bytes_sent = 0
+        for line in self._read(4).splitlines()[2:]:
+            fields = line.partition(b':')[2].split()
+            bytes_recv += int(fields[0])
+            bytes_sent += int(fields[8])
+
+        ticks, now = self._process_ticks(), time.monotonic()
+        last_ticks, last_now = self._last_proc
+        self._last_proc = (ticks, now)
+        elapsed = now - last_now
+        process_cpu = 100.0 * (ticks - last_ticks) / self._clock_ticks / elapsed if elapsed > 0 else 0.0
+
+        rss = int(self._read(3).split()[1]) * self._page_size
+
+        return [
+            ('system.cpu.usage', cpu_percent, 'percent'),
+            ('system.memory.usage', 100.0 * mem_used / mem_total, 'percent'),
+            ('system.memory.used', mem_used / _MB, 'MB'),
+            ('system.disk.usage', 100.0 * disk_used / disk_total if disk_total else 0.0, 'percent'),
+            ('system.network.bytes_sent', bytes_sent / _MB, 'MB'),
+            ('system.network.bytes_recv', bytes_recv / _MB, 'MB'),
+            ('process.cpu.usage', process_cpu, 'percent'),
+            ('process.memory.rss', rss / _MB, 'MB'),
+        ]
 
 
 class MetricsCollector:
     """Collects and aggregates performance metrics"""
 
     def __init__(self, retention_period: int = 3600):  # 1 hour default
-        self.metrics: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
-        self.aggregates: Dict[str, Dict[str, Any]] = {}
+        # One preallocated ring of epoch timestamps and values per gauge
+        self.metrics: Dict[str, _RingSeries] = {}
+        self.aggregates: Dict[str, _RunningStats] = {}
+        # Counters skip the sample window entirely; gauges serialise per
+        # metric on one of a fixed set of locks picked by hash(name)
+        self._counters: Dict[str, _AtomicCounter] = {}
+        self._versions: Dict[str, int] = {}
+        # Per-metric label set -> small id; samples store only the id
+        self._label_interner: Dict[str, Dict[Tuple[Tuple[str, str], ...], int]] = defaultdict(dict)
+        self._shard_locks = [threading.RLock() for _ in range(_METRIC_SHARDS)]
         self.retention_period = retention_period
         self.collection_interval = 10  # seconds
         self._running = False
-        self._collection_thread: Optional[threading.Thread] = None
+        self._collection_task: Optional[asyncio.Task] = None
+        self._proc: Optional[_ProcReader] = None
+        self._process: Optional[psutil.Process] = None
 
-    def start_collection(self):
-        """Start metrics collection"""
+    def start_collection(self) -> asyncio.Task:
+        """Start metrics collection as a task on the running event loop"""
         self._running = True
-        self._collection_thread = threading.Thread(target=self._collection_loop, daemon=True)
-        self._collection_thread.start()
+        if self._collection_task is None or self._collection_task.done():
+            self._collection_task = asyncio.get_running_loop().create_task(self._collection_loop())
+        return self._collection_task
 
     def stop_collection(self):
         """Stop metrics collection"""
         self._running = False
-        if self._collection_thread:
-            self._collection_thread.join(timeout=5)
+        if self._collection_task is not None:
+            self._collection_task.cancel()
+            self._collection_task = None
+        if self._proc is not None:
+            self._proc.close()
+            self._proc = None
 
     def record_metric(self, name: str, value: float, labels: Dict[str, str] = None, metric_type: MetricType = MetricType.GAUGE):
         """Record a metric value"""
-        labels = labels or {}
-        metric = Metric(
-            name=name,
-            type=metric_type,
-            value=value,
-            labels=labels,
-            description=self._get_metric_description(name)
-        )
+        if metric_type is MetricType.COUNTER:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters.setdefault(name, _AtomicCounter())
+            counter.add(value)
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return
 
-        self.metrics[name].append(metric)
+        with self._shard_locks[hash(name) & (_METRIC_SHARDS - 1)]:
+            series = self.metrics.get(name)
+            if series is None:
+                series = _RingSeries(_SERIES_CAPACITY)
+                stats = self.aggregates[name] = _RunningStats()
+                self.metrics[name] = series
+            else:
+                stats = self.aggregates[name]
+            interner = self._label_interner[name]
+            key = tuple(sorted(labels.items())) if labels else ()
+            label_id = interner.get(key)
+            if label_id is None:
+                label_id = interner[key] = len(interner)
+            evicted = series.append(value, time.time(), label_id)
+            if evicted is not None:
+                stats.remove(evicted)
+            stats.add(value)
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get_label_sets(self, name: str) -> List[Dict[str, str]]:
+        """Distinct label sets recorded for a metric, indexed by label id"""
+        interner = self._label_interner.get(name)
+        if not interner:
+            return []
+        label_sets: List[Dict[str, str]] = [{}] * len(interner)
+        for key, label_id in interner.items():
+            label_sets[label_id] = dict(key)
+        return label_sets
+
+    def get_latest_labels(self, name: str) -> Dict[str, str]:
+        """Labels attached to the most recent sample of a gauge"""
+        series = self.metrics.get(name)
+        if series is None or not series.n:
+            return {}
+        return self.get_label_sets(name)[series.latest_label_id()]
+
+    def snapshot(self, since: float) -> Dict[str, Tuple[array, array]]:
+        """Samples recorded after ``since`` as {name: (timestamps, values)} columns
+
+        Gauges contribute their raw samples; counters contribute their
+        current total as a single point.
+        """
+        result = {}
+        now = time.time()
+        for name in list(self.metrics):
+            with self._shard_locks[hash(name) & (_METRIC_SHARDS - 1)]:
+                timestamps, values = self.metrics[name].columns_since(since)
+                if len(values):
+                    # Copies, so callers never hold a view into the live ring
+                    result[name] = (array('d', timestamps.tobytes()), array('d', values.tobytes()))
+        for name, counter in list(self._counters.items()):
+            result[name] = (array('d', (now,)), array('d', (counter.value,)))
+        return result
 
-        # Update aggregates
-        self._update_aggregates(name)
+    def metric_version(self, name: str) -> int:
+        """Number of times a metric has been recorded; changes whenever it does"""
+        return self._versions.get(name, 0)
 
     def get_metric(self, name: str, time_range: int = 300) -> Optional[Dict[str, Any]]:
         """Get metric data for a time range"""
-        if name not in self.metrics:
-            return None
-
-        cutoff_time = datetime.utcnow() - timedelta(seconds=time_range)
-        recent_metrics = [m for m in self.metrics[name] if m.timestamp > cutoff_time]
-
-        if not recent_metrics:
+        counter = self._counters.get(name)
+        if counter is not None:
+            total = counter.value
+            return {
+                'name': name,
+                'current': total,
+                'min': total,
+                'max': total,
+                'avg': total,
+                'count': 1,
+                'time_range_seconds': time_range
+            }
+
+        series = self.metrics.get(name)
+        if series is None:
             return None
 
-        values = [m.value for m in recent_metrics]
+        with self._shard_locks[hash(name) & (_METRIC_SHARDS - 1)]:
+            values = series.window(time.time() - time_range)
+            count = len(values)
+            if not count:
+                return None
+            current, low, high, avg = _window_stats(values)
 
         return {
             'name': name,
-            'current': values[-1] if values else 0,
-            'min': min(values) if values else 0,
-            'max': max(values) if values else 0,
-            'avg': statistics.mean(values) if values else 0,
-            'count': len(values),
+            'current': current,
+            'min': low,
+            'max': high,
+            'avg': avg,
+            'count': count,
             'time_range_seconds': time_range
         }
 
     def get_all_metrics(self) -> Dict[str, Dict[str, Any]]:
         """Get all available metrics"""
         result = {}
-        for name in self.metrics.keys():
+        for name in [*self.metrics, *self._counters]:
             metric_data = self.get_metric(name)
             if metric_data:
                 result[name] = metric_data
         return result
 
-    def _collection_loop(self):
+    async def _collection_loop(self):
         """Main metrics collection loop"""
         while self._running:
             try:
-                self._collect_system_metrics()
-                time.sleep(self.collection_interval)
+                await self._collect_system_metrics()
             except Exception as e:
                 print(f"Error in metrics collection: {e}")
-                time.sleep(self.collection_interval)
+            await asyncio.sleep(self.collection_interval)
 
-    def _collect_system_metrics(self):
+    async def _collect_system_metrics(self):
         """Collect system-level metrics"""
-        # CPU usage
-        cpu_percent = psutil.cpu_percent(interval=1)
-        self.record_metric('system.cpu.usage', cpu_percent, {'unit': 'percent'})
+        if self._proc is None and _ProcReader.available():
+            self._proc = _ProcReader()
 
-        # Memory usage
-        memory = psutil.virtual_memory()
-        self.record_metric('system.memory.usage', memory.percent, {'unit': 'percent'})
-        self.record_metric('system.memory.used', memory.used / 1024 / 1024, {'unit': 'MB'})
+        if self._proc is not None:
+            # A few preads of in-memory files; cheaper inline than a thread hop
+            readings = self._proc.read()
+        else:
+            readings = await asyncio.to_thread(self._read_psutil)
 
-        # Disk usage
-        disk = psutil.disk_usage('/')
-        self.record_metric('system.disk.usage', disk.percent, {'unit': 'percent'})
+        for name, value, unit in readings:
+            self.record_metric(name, value, {'unit': unit})
 
-        # Network I/O
+    def _read_psutil(self) -> List[Tuple[str, float, str]]:
+        """Portable fallback for platforms without /proc"""
+        if self._process is None:
+            self._process = psutil.Process()
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
         net_io = psutil.net_io_counters()
-        self.record_metric('system.network.bytes_sent', net_io.bytes_sent / 1024 / 1024, {'unit': 'MB'})
-        self.record_metric('system.network.bytes_recv', net_io.bytes_recv / 1024 / 1024, {'unit': 'MB'})
 
-        # Process information
-        process = psutil.Process()
-        self.record_metric('process.cpu.usage', process.cpu_percent(), {'unit': 'percent'})
-        self.record_metric('process.memory.rss', process.memory_info().rss / 1024 / 1024, {'unit': 'MB'})
+        # interval=None measures since the previous call instead of blocking
+        return [
+            ('system.cpu.usage', psutil.cpu_percent(interval=None), 'percent'),
+            ('system.memory.usage', memory.percent, 'percent'),
+            ('system.memory.used', memory.used / _MB, 'MB'),
+            ('system.disk.usage', disk.percent, 'percent'),
+            ('system.network.bytes_sent', net_io.bytes_sent / _MB, 'MB'),
+            ('system.network.bytes_recv', net_io.bytes_recv / _MB, 'MB'),
+            ('process.cpu.usage', self._process.cpu_percent(), 'percent'),
+            ('process.memory.rss', self._process.memory_info().rss / _MB, 'MB'),
+        ]
 
-    def _update_aggregates(self, metric_name: str):
-        """Update aggregate statistics for a metric"""
-        if metric_name not in self.metrics:
-            return
+    def get_aggregates(self, metric_name: str) -> Optional[Dict[str, Any]]:
+        """Get aggregate statistics over all retained samples of a metric"""
+        stats = self.aggregates.get(metric_name)
+        if stats is None or not stats.count:
+            return None
 
-        metrics = list(self.metrics[metric_name])
-        if not metrics:
-            return
+        with self._shard_locks[hash(metric_name) & (_METRIC_SHARDS - 1)]:
+            series = self.metrics[metric_name]
+            if stats.extremes_stale:
+                stats.refresh_extremes(series.filled())
 
-        values = [m.value for m in metrics]
-        timestamps = [m.timestamp for m in metrics]
-
-        self.aggregates[metric_name] = {
-            'count': len(values),
-            'sum': sum(values),
-            'min': min(values),
-            'max': max(values),
-            'avg': statistics.mean(values),
-            'stddev': statistics.stdev(values) if len(values) > 1 else 0,
-            'latest': values[-1],
-            'latest_timestamp': timestamps[-1],
-            'time_span': (timestamps[-1] - timestamps[0]).total_seconds() if len(timestamps) > 1 else 0
-        }
+            return {
+                'count': stats.count,
+                'sum': stats.sum,
+                'min': stats.min,
+                'max': stats.max,
+                'avg': stats.mean,
+                'stddev': stats.stddev,
+                'latest': stats.latest,
+                'latest_timestamp': series.latest_timestamp(),
+                'time_span': series.latest_timestamp() - series.oldest_timestamp()
+            }
 
-    def _get_metric_description(self, name: str) -> str:
-        """Get description for a metric name"""
-        descriptions = {
-            'system.cpu.usage': 'System CPU usage percentage',
-            'system.memory.usage': 'System memory usage percentage',
-            'system.disk.usage': 'System disk usage percentage',
-            'system.network.bytes_sent': 'Network bytes sent',
-            'system.network.bytes_recv': 'Network bytes received',
-            'process.cpu.usage': 'Process CPU usage percentage',
-            'process.memory.rss': 'Process resident set size memory',
-            'api.request.count': 'Total API requests',
-            'api.request.duration': 'API request duration',
-            'api.error.count': 'API error count',
-            'agent.task.count': 'Agent task count',
-            'agent.task.duration': 'Agent task duration'
-        }
-        return descriptions.get(name, f'Metric: {name}')
+
+def _approx_equal(value: float, threshold: float) -> bool:
+    return abs(value - threshold) < 0.001
+
+
+def _never(value: float, threshold: float) -> bool:
+    return False
+
+
+# Alert rule condition -> predicate(value, threshold), resolved once per rule
+_CONDITION_PREDICATES: Dict[str, Callable[[float, float], bool]] = {
+    'above': operator.gt,
+    'below': operator.lt,
+    'equals': _approx_equal,
+}
+
+
+# Resolved-alert history record: severity index, threshold, value at trigger,
+# triggered at, resolved at, rule id into AlertSystem._rule_table
+_ALERT_RECORD = struct.Struct('<BddddI')
+_ALERT_HISTORY_SIZE = 1000
+_SEVERITIES = tuple(AlertSeverity)
+
+
+def _encode_report_value(obj: Any) -> Any:
+    """JSON fallback for the report's dataclasses, enums and datetimes"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_report(report: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        # orjson serialises dataclasses and enums natively
+        return orjson.dumps(report, default=_encode_report_value, option=orjson.OPT_NAIVE_UTC)
+    return json.dumps(report, default=_encode_report_value).encode()
+
+
+def _log_callback_failure(task: asyncio.Future):
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug("Alert callback failed", exc_info=task.exception())
 
 
 class AlertSystem:
@@ -230,7 +719,15 @@ class AlertSystem:
         self.alerts: Dict[str, Alert] = {}
         self.alert_rules: Dict[str, Dict[str, Any]] = {}
         self.alert_callbacks: List[Callable] = []
-        self.resolved_alerts: deque = deque(maxlen=1000)
+        # Resolved alerts packed into a fixed ring of _ALERT_RECORD structs;
+        # rule name/metric/condition/description live once in _rule_table
+        self._history = bytearray(_ALERT_RECORD.size * _ALERT_HISTORY_SIZE)
+        self._history_head = 0
+        self._history_len = 0
+        self._rule_ids: Dict[Tuple[str, str, str, str], int] = {}
+        self._rule_table: List[Tuple[str, str, str, str]] = []
+        # Loop that async callbacks are scheduled on; set by start_monitoring
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     def add_alert_rule(self, name: str, metric_name: str, threshold: float,
                       condition: str, severity: AlertSeverity, description: str = ""):
@@ -241,7 +738,8 @@ class AlertSystem:
             'condition': condition,
             'severity': severity,
             'description': description,
-            'enabled': True
+            'enabled': True,
+            '_pred': _CONDITION_PREDICATES.get(condition, _never)
         }
 
     def remove_alert_rule(self, name: str):
@@ -255,38 +753,32 @@ class AlertSystem:
             if not rule['enabled']:
                 continue
 
+            # Rules only look at the latest value, so an unrecorded or unchanged
+            # metric cannot change the outcome of the last evaluation
+            version = metrics_collector.metric_version(rule['metric_name'])
+            if not version or rule.get('_last_v') == version:
+                continue
+
             metric_data = metrics_collector.get_metric(rule['metric_name'])
             if not metric_data:
                 continue
+            rule['_last_v'] = version
 
             current_value = metric_data['current']
-            threshold = rule['threshold']
-            condition = rule['condition']
-
-            alert_triggered = self._check_condition(current_value, threshold, condition)
 
-            if alert_triggered:
+            if rule['_pred'](current_value, rule['threshold']):
                 self._trigger_alert(rule_name, rule, current_value)
             else:
                 self._resolve_alert(rule_name)
 
-    def _check_condition(self, value: float, threshold: float, condition: str) -> bool:
-        """Check if alert condition is met"""
-        if condition == 'above':
-            return value > threshold
-        elif condition == 'below':
-            return value < threshold
-        elif condition == 'equals':
-            return abs(value - threshold) < 0.001
-        return False
-
     def _trigger_alert(self, rule_name: str, rule: Dict[str, Any], current_value: float):
         """Trigger an alert"""
         if rule_name in self.alerts and not self.alerts[rule_name].resolved:
             return  # Alert already active
 
+        now = time.time()
         alert = Alert(
-            id=f"{rule_name}_{int(time.time())}",
+            id=f"{rule_name}_{int(now)}",
             name=rule_name,
             severity=rule['severity'],
             message=f"{rule['description']} - Current: {current_value:.2f}, Threshold: {rule['threshold']:.2f}",
@@ -294,7 +786,7 @@ class AlertSystem:
             threshold=rule['threshold'],
             current_value=current_value,
             condition=rule['condition'],
-            timestamp=datetime.utcnow()
+            timestamp=now
         )
 
         self.alerts[rule_name] = alert
@@ -302,17 +794,54 @@ class AlertSystem:
         # Notify callbacks
         for callback in self.alert_callbacks:
             try:
-                asyncio.run(callback(alert))
-            except:
-                pass  # Ignore callback errors
+                if asyncio.iscoroutinefunction(callback):
+                    self._schedule_callback(callback(alert))
+                else:
+                    callback(alert)
+            except Exception:
+                logger.debug("Alert callback %r failed", callback, exc_info=True)
+
+    def _schedule_callback(self, coro):
+        """Run an alert coroutine on the monitor's loop without blocking the caller"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+        if loop is None:
+            asyncio.run(coro)  # No loop anywhere; run it to completion here
+        else:
+            loop.call_soon_threadsafe(self._start_callback_task, coro)
+
+    @staticmethod
+    def _start_callback_task(coro):
+        asyncio.ensure_future(coro).add_done_callback(_log_callback_failure)
 
     def _resolve_alert(self, rule_name: str):
         """Resolve an alert"""
         if rule_name in self.alerts and not self.alerts[rule_name].resolved:
             alert = self.alerts[rule_name]
             alert.resolved = True
-            alert.resolved_at = datetime.utcnow()
-            self.resolved_alerts.append(alert)
+            alert.resolved_at = time.time()
+            self._record_history(alert)
+
+    def _record_history(self, alert: Alert):
+        rule = self.alert_rules.get(alert.name)
+        key = (alert.name, alert.metric_name, alert.condition, rule['description'] if rule else "")
+        rule_id = self._rule_ids.get(key)
+        if rule_id is None:
+            rule_id = self._rule_ids[key] = len(self._rule_table)
+            self._rule_table.append(key)
+
+        _ALERT_RECORD.pack_into(
+            self._history, self._history_head * _ALERT_RECORD.size,
+            _SEVERITIES.index(alert.severity), alert.threshold, alert.current_value,
+            alert.timestamp, alert.resolved_at, rule_id
+        )
+        self._history_head = (self._history_head + 1) % _ALERT_HISTORY_SIZE
+        if self._history_len < _ALERT_HISTORY_SIZE:
+            self._history_len += 1
 
     def add_alert_callback(self, callback: Callable):
         """Add callback for alert notifications"""
@@ -323,63 +852,169 @@ class AlertSystem:
         return [alert for alert in self.alerts.values() if not alert.resolved]
 
     def get_alert_history(self, limit: int = 100) -> List[Alert]:
-        """Get alert history"""
-        return list(self.resolved_alerts)[-limit:]
+        """Get alert history, oldest first, rebuilt from the packed records"""
+        count = min(limit, self._history_len) if limit > 0 else self._history_len
+        history = []
+        for k in range(self._history_head - count, self._history_head):
+            severity, threshold, value, triggered_at, resolved_at, rule_id = _ALERT_RECORD.unpack_from(
+                self._history, (k % _ALERT_HISTORY_SIZE) * _ALERT_RECORD.size
+            )
+            name, metric_name, condition, description = self._rule_table[rule_id]
+            history.append(Alert(
+                id=f"{name}_{int(triggered_at)}",
+                name=name,
+                severity=_SEVERITIES[severity],
+                message=f"{description} - Current: {value:.2f}, Threshold: {threshold:.2f}",
+                metric_name=metric_name,
+                threshold=threshold,
+                current_value=value,
+                condition=condition,
+                timestamp=triggered_at,
+                resolved=True,
+                resolved_at=resolved_at
+            ))
+        return history
 
 
 class PredictiveAnalyzer:
     """Predictive analytics for performance issues"""
 
     def __init__(self):
-        self.historical_data: Dict[str, List[Tuple[datetime, float]]] = defaultdict(list)
+        # Parallel (timestamps, values) columns of the most recent points per
+        # metric, oldest first; lifetime distribution lives in the digests
+        self.historical_data: Dict[str, Tuple[array, array]] = defaultdict(
+            lambda: (array('d'), array('d'))
+        )
+        self._scalars: Dict[str, _RunningStats] = {}
+        self._regressions: Dict[str, _RegressionSums] = {}
+        self._digests: Dict[str, Any] = {}  # crick.TDigest per metric, if installed
         self.prediction_models: Dict[str, Dict[str, Any]] = {}
         self.anomaly_threshold = 2.0  # Standard deviations
 
-    def add_data_point(self, metric_name: str, value: float, timestamp: datetime = None):
-        """Add data point for analysis"""
-        timestamp = timestamp or datetime.utcnow()
-        self.historical_data[metric_name].append((timestamp, value))
+    def add_data_point(self, metric_name: str, value: float, timestamp: float = None):
+        """Add data point for analysis (timestamp in POSIX seconds)"""
+        now = time.time()
+        timestamp = timestamp or now
+        timestamps, values = self.historical_data[metric_name]
+        timestamps.append(timestamp)
+        values.append(value)
+
+        self._stats_for(metric_name).add(value)
+        if TDigest is not None:
+            self._digests[metric_name].add(value)
+        self._regression_for(metric_name, timestamp).add(timestamp, value)
+
+        self._prune(metric_name, now)
+
+    def ingest(self, snapshot: Dict[str, Tuple[array, array]]):
+        """Bulk-add the {name: (timestamps, values)} columns from MetricsCollector.snapshot"""
+        now = time.time()
+        for metric_name, (new_timestamps, new_values) in snapshot.items():
+            timestamps, values = self.historical_data[metric_name]
+            timestamps.extend(new_timestamps)
+            values.extend(new_values)
+
+            stats = self._stats_for(metric_name)
+            regression = self._regression_for(metric_name, new_timestamps[0])
+            for timestamp, value in zip(new_timestamps, new_values):
+                stats.add(value)
+                regression.add(timestamp, value)
+            if TDigest is not None:
+                self._digests[metric_name].update(new_values)
+
+            self._prune(metric_name, now)
+
+    def _stats_for(self, metric_name: str) -> _RunningStats:
+        stats = self._scalars.get(metric_name)
+        if stats is None:
+            stats = self._scalars[metric_name] = _RunningStats()
+            if TDigest is not None:
+                self._digests[metric_name] = TDigest()
+        return stats
+
+    def _regression_for(self, metric_name: str, origin: float) -> _RegressionSums:
+        regression = self._regressions.get(metric_name)
+        if regression is None:
+            regression = self._regressions[metric_name] = _RegressionSums(origin)
+        return regression
+
+    def _prune(self, metric_name: str, now: float):
+        """Keep only the recent window, and nothing older than 24 hours"""
+        timestamps, values = self.historical_data[metric_name]
+        expired = max(
+            len(values) - _HISTORY_WINDOW,
+            bisect.bisect_right(timestamps, now - 24 * 3600)
+        )
+        if expired > 0:
+            regression = self._regressions[metric_name]
+            for i in range(expired):
+                regression.remove(timestamps[i], values[i])
+            del timestamps[:expired], values[:expired]
+            if regression.removals >= _REGRESSION_REBUILD_EVERY:
+                regression.rebuild(timestamps, values)
+
+    def get_distribution(self, metric_name: str) -> Optional[Dict[str, Optional[float]]]:
+        """Lifetime count/mean/stddev/min/max plus p50/p95/p99 for a metric
+
+        Percentiles come from a t-digest when crick is installed; otherwise
+        they are taken over the recent window only, and are None once every
+        point in it has aged out.
+        """
+        stats = self._scalars.get(metric_name)
+        if stats is None:
+            return None
 
-        # Keep only recent data (last 24 hours)
-        cutoff = datetime.utcnow() - timedelta(hours=24)
-        self.historical_data[metric_name] = [
-            (ts, val) for ts, val in self.historical_data[metric_name] if ts > cutoff
-        ]
+        digest = self._digests.get(metric_name)
+        if digest is not None:
+            quantiles = [float(digest.quantile(q)) for q in _PERCENTILES]
+        else:
+            ordered = sorted(self.historical_data[metric_name][1])
+            last = len(ordered) - 1
+            quantiles = [ordered[round(q * last)] if ordered else None for q in _PERCENTILES]
+
+        return {
+            'count': stats.count,
+            'mean': stats.mean,
+            'stddev': stats.stddev,
+            'min': stats.min,
+            'max': stats.max,
+            'p50': quantiles[0],
+            'p95': quantiles[1],
+            'p99': quantiles[2]
+        }
 
     def predict_trend(self, metric_name: str, hours_ahead: int = 1) -> Dict[str, Any]:
         """Predict future values for a metric"""
         if metric_name not in self.historical_data:
             return {'error': 'No historical data available'}
 
-        data = self.historical_data[metric_name]
-        if len(data) < 10:  # Need minimum data points
+        timestamps, values = self.historical_data[metric_name]
+        n = len(values)
+        if n < 10:  # Need minimum data points
             return {'error': 'Insufficient data for prediction'}
 
-        # Simple linear regression for trend prediction
-        timestamps = [(ts - data[0][0]).total_seconds() / 3600 for ts, _ in data]  # Hours from start
-        values = [val for _, val in data]
-
-        if len(set(values)) <= 1:  # No variation
+        low, high = min(values), max(values)
+        if low == high:  # No variation
             return {'predicted_value': values[0], 'confidence': 0.5}
 
-        # Calculate linear regression
-        n = len(timestamps)
-        sum_x = sum(timestamps)
-        sum_y = sum(values)
-        sum_xy = sum(x * y for x, y in zip(timestamps, values))
-        sum_xx = sum(x * x for x in timestamps)
-
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
-        intercept = (sum_y - slope * sum_x) / n
+        # Simple linear regression for trend prediction, x in hours, from the
+        # running sums kept in step with the window
+        r = self._regressions[metric_name]
+        denominator = n * r.sxx - r.sx * r.sx
+        slope = (n * r.sxy - r.sx * r.sy) / denominator if denominator > 0 else 0.0
+        intercept = (r.sy - slope * r.sx) / n
+        # Mean squared residual, expanded so it needs only the sums
+        mse = max(0.0, (
+            r.syy - 2 * slope * r.sxy - 2 * intercept * r.sy
+            + slope * slope * r.sxx + 2 * slope * intercept * r.sx + n * intercept * intercept
+        ) / n)
 
         # Predict future value
-        future_x = timestamps[-1] + hours_ahead
+        future_x = (timestamps[-1] - r.origin) / 3600 + hours_ahead
         predicted_value = slope * future_x + intercept
 
         # Calculate confidence (simplified)
-        residuals = [y - (slope * x + intercept) for x, y in zip(timestamps, values)]
-        mse = sum(r * r for r in residuals) / len(residuals)
-        confidence = max(0, 1 - mse / (max(values) - min(values) + 1))
+        confidence = max(0, 1 - mse / (high - low + 1))
 
         return {
             'current_value': values[-1],
@@ -394,45 +1029,76 @@ class PredictiveAnalyzer:
         if metric_name not in self.historical_data:
             return []
 
-        data = self.historical_data[metric_name]
-        if len(data) < 20:  # Need sufficient data
+        timestamps, values = self.historical_data[metric_name]
+        if len(values) < 20:  # Need sufficient data
             return []
 
-        values = [val for _, val in data]
-
         # Calculate rolling mean and standard deviation
         window_size = min(10, len(values) // 2)
-        anomalies = []
-
-        for i in range(window_size, len(values)):
-            window = values[i-window_size:i]
-            mean = statistics.mean(window)
-            stddev = statistics.stdev(window) if len(window) > 1 else 0
-
-            current_value = values[i]
-            if stddev > 0:
-                z_score = abs(current_value - mean) / stddev
-                if z_score > self.anomaly_threshold:
-                    anomalies.append({
-                        'timestamp': data[i][0],
-                        'value': current_value,
-                        'expected_range': (mean - stddev, mean + stddev),
-                        'z_score': z_score,
-                        'severity': 'high' if z_score > 3 else 'medium'
-                    })
-
-        return anomalies[-10:]  # Return last 10 anomalies
-
-    def get_recommendations(self, metric_name: str) -> List[str]:
-        """Get recommendations based on metric analysis"""
+        threshold = self.anomaly_threshold
+        kernel = _get_jit_rolling_zscore()
+
+        if kernel is not None:
+            v = np.frombuffer(values)
+            indices, means, stddevs, z_scores = kernel(v, window_size, threshold)
+            hits = list(zip(indices[-10:].tolist(), means[-10:].tolist(),
+                            stddevs[-10:].tolist(), z_scores[-10:].tolist()))
+            del v
+        elif np is not None:
+            v = np.frombuffer(values)
+            windows = sliding_window_view(v[:-1], window_size)
+            means = windows.mean(axis=1)
+            stddevs = windows.std(axis=1, ddof=1)
+            current = v[window_size:]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z_scores = np.where(stddevs > 0, np.abs(current - means) / stddevs, 0.0)
+            hits = [
+                (int(j) + window_size, float(means[j]), float(stddevs[j]), float(z_scores[j]))
+                for j in np.flatnonzero(z_scores > threshold)[-10:]
+            ]
+            del v, windows, current  # release the buffer exports before the arrays grow again
+        else:
+            hits = []
+            for i in range(window_size, len(values)):
+                window = values[i-window_size:i]
+                mean = statistics.mean(window)
+                stddev = statistics.stdev(window) if len(window) > 1 else 0
+
+                if stddev > 0:
+                    z_score = abs(values[i] - mean) / stddev
+                    if z_score > threshold:
+                        hits.append((i, mean, stddev, z_score))
+
+        anomalies = [
+            {
+                'timestamp': timestamps[i],
+                'value': values[i],
+                'expected_range': (mean - stddev, mean + stddev),
+                'z_score': z_score,
+                'severity': 'high' if z_score > 3 else 'medium'
+            }
+            for i, mean, stddev, z_score in hits[-10:]
+        ]
+
+        return anomalies  # Last 10 anomalies
+
+    def get_recommendations(self, metric_name: str, prediction: Optional[Dict[str, Any]] = None,
+                            anomalies: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        """Get recommendations based on metric analysis
+
+        Callers that already ran predict_trend/detect_anomalies for the metric
+        can pass the results in to avoid recomputing them.
+        """
         recommendations = []
 
-        prediction = self.predict_trend(metric_name)
-        if 'predicted_value' in prediction:
+        if prediction is None:
+            prediction = self.predict_trend(metric_name)
+        if 'predicted_value' in prediction and 'trend' in prediction:
             if prediction['trend'] == 'increasing' and prediction['predicted_value'] > 80:
                 recommendations.append(f"High {metric_name} predicted - consider scaling resources")
 
-        anomalies = self.detect_anomalies(metric_name)
+        if anomalies is None:
+            anomalies = self.detect_anomalies(metric_name)
         if anomalies:
             recommendations.append(f"Anomalies detected in {metric_name} - investigate recent changes")
 
@@ -448,10 +1114,23 @@ class PerformanceMonitor:
         self.predictive_analyzer = PredictiveAnalyzer()
         self.health_checks: Dict[str, Callable] = {}
         self._monitoring_active = False
+        self._ingested_until = 0.0  # newest sample timestamp fed to the analyzer
+        # Per-(endpoint, method, status) request table: a small id per triple
+        # indexes a flat count column and a running duration summary
+        self._api_lock = threading.Lock()
+        self._api_ids: Dict[Tuple[str, str, int], int] = {}
+        self._api_keys: List[Tuple[str, str, int]] = []
+        # array('q') rather than an int64 ndarray: scalar += on NumPy is slower
+        self._api_counts = array('q', bytes(8 * _API_TABLE_INITIAL))
+        self._api_durations: List[_RunningStats] = []
+        self._api_digests: List[Any] = []
+        self._api_rollup = (0, 0.0)  # (count, duration sum) already published as a gauge
+        self._api_rate_requests = 0  # Request total behind the last api.error.rate sample
 
     async def start_monitoring(self):
         """Start the performance monitoring system"""
         self._monitoring_active = True
+        self.alert_system._loop = asyncio.get_running_loop()
         self.metrics_collector.start_collection()
 
         # Set up default alert rules
@@ -470,29 +1149,84 @@ class PerformanceMonitor:
         self.health_checks[name] = check_func
 
     def record_api_request(self, endpoint: str, duration: float, status_code: int, method: str = "GET"):
-        """Record API request metrics"""
-        self.metrics_collector.record_metric(
-            'api.request.count',
-            1,
-            {'endpoint': endpoint, 'method': method, 'status': str(status_code)},
-            MetricType.COUNTER
-        )
-
-        self.metrics_collector.record_metric(
-            'api.request.duration',
-            duration,
-            {'endpoint': endpoint, 'method': method},
-            MetricType.GAUGE
-        )
-
+        """Record API request metrics
+
+        Per-request data goes to the API table only; the monitoring loop
+        publishes the mean duration as the api.request.duration gauge.
+        """
+        key = (endpoint, method, status_code)
+        with self._api_lock:
+            i = self._api_ids.get(key)
+            if i is None:
+                i = self._register_api_key(key)
+            self._api_counts[i] += 1
+            self._api_durations[i].add(duration)
+            if TDigest is not None:
+                self._api_digests[i].add(duration)
+
+        self.metrics_collector.record_metric('api.request.count', 1, metric_type=MetricType.COUNTER)
         if status_code >= 400:
+            self.metrics_collector.record_metric('api.error.count', 1, metric_type=MetricType.COUNTER)
+
+    def _register_api_key(self, key: Tuple[str, str, int]) -> int:
+        i = self._api_ids[key] = len(self._api_keys)
+        self._api_keys.append(key)
+        self._api_durations.append(_RunningStats())
+        if TDigest is not None:
+            self._api_digests.append(TDigest())
+        if i == len(self._api_counts):
+            self._api_counts.frombytes(bytes(8 * len(self._api_counts)))
+        return i
+
+    def get_api_stats(self) -> List[Dict[str, Any]]:
+        """Request count and duration summary per (endpoint, method, status)"""
+        with self._api_lock:
+            stats = []
+            for i, (endpoint, method, status_code) in enumerate(self._api_keys):
+                durations = self._api_durations[i]
+                entry = {
+                    'endpoint': endpoint,
+                    'method': method,
+                    'status': status_code,
+                    'count': int(self._api_counts[i]),
+                    'duration_avg': durations.mean,
+                    'duration_min': durations.min,
+                    'duration_max': durations.max
+                }
+                if TDigest is not None:
+                    entry['duration_p95'] = float(self._api_digests[i].quantile(0.95))
+                stats.append(entry)
+            return stats
+
+    def _publish_api_duration(self):
+        """Record the mean duration of requests seen since the last call as a gauge"""
+        with self._api_lock:
+            count = sum(d.count for d in self._api_durations)
+            total = math.fsum(d.sum for d in self._api_durations)
+        last_count, last_total = self._api_rollup
+        if count > last_count:
+            self._api_rollup = (count, total)
             self.metrics_collector.record_metric(
-                'api.error.count',
-                1,
-                {'endpoint': endpoint, 'status': str(status_code)},
-                MetricType.COUNTER
+                'api.request.duration', (total - last_total) / (count - last_count), {'unit': 'seconds'}
             )
 
+    def _publish_api_error_rate(self):
+        """Record errors as a percentage of all requests as a gauge
+
+        The request and error counters are lifetime totals, so a rule on the
+        raw error count would fire on a handful of errors and never resolve.
+        """
+        requests = self.metrics_collector.get_metric('api.request.count')
+        if requests is None or requests['current'] == self._api_rate_requests:
+            return
+        errors = self.metrics_collector.get_metric('api.error.count')
+        self._api_rate_requests = requests['current']
+        self.metrics_collector.record_metric(
+            'api.error.rate',
+            errors['current'] / requests['current'] * 100 if errors else 0.0,
+            {'unit': 'percent'}
+        )
+
     def record_agent_task(self, agent_type: str, task_name: str, duration: float, success: bool):
         """Record agent task metrics"""
         self.metrics_collector.record_metric(
@@ -511,12 +1245,15 @@ class PerformanceMonitor:
 
     async def get_system_health(self) -> SystemHealth:
         """Get comprehensive system health status"""
+        self._publish_api_duration()
+        self._publish_api_error_rate()
         metrics = self.metrics_collector.get_all_metrics()
 
         # Calculate overall status
         cpu_usage = metrics.get('system.cpu.usage', {}).get('current', 0)
         memory_usage = metrics.get('system.memory.usage', {}).get('current', 0)
-        error_rate = metrics.get('api.error.count', {}).get('current', 0)
+
+        error_rate = metrics.get('api.error.rate', {}).get('current', 0)
 
         if cpu_usage > 90 or memory_usage > 90 or error_rate > 10:
             overall_status = 'unhealthy'
@@ -544,61 +1281,96 @@ class PerformanceMonitor:
             response_time_avg=metrics.get('api.request.duration', {}).get('avg', 0),
             error_rate=error_rate,
             uptime=uptime,
-            last_updated=datetime.utcnow()
+            last_updated=time.time()
         )
 
     async def get_performance_report(self) -> Dict[str, Any]:
-        """Generate comprehensive performance report"""
+        """Generate comprehensive performance report
+
+        Alerts and system health are plain dicts with enum values and ISO
+        timestamps; get_performance_report_json() skips that conversion.
+        """
+        report = await self._build_report()
+        report['active_alerts'] = [self._alert_to_dict(alert) for alert in report['active_alerts']]
+        report['system_health'] = self._health_to_dict(report['system_health'])
+        return report
+
+    async def _build_report(self) -> Dict[str, Any]:
+        """Report with alerts and system health still as dataclasses"""
         metrics = self.metrics_collector.get_all_metrics()
+        for metric_name, metric_data in metrics.items():
+            metric_data['description'] = _METRIC_DESCRIPTIONS.get(metric_name, metric_name)
         active_alerts = self.alert_system.get_active_alerts()
 
+        # Run each metric's trend and anomaly pass exactly once; predictions,
+        # anomalies and recommendations below all read from these
+        analyzer = self.predictive_analyzer
+        key_metrics = ('system.cpu.usage', 'system.memory.usage', 'api.request.duration')
+        all_predictions = {name: analyzer.predict_trend(name) for name in dict.fromkeys((*key_metrics, *metrics))}
+        all_anomalies = {name: analyzer.detect_anomalies(name) for name in metrics}
+
         # Get predictions for key metrics
         predictions = {}
-        for metric_name in ['system.cpu.usage', 'system.memory.usage', 'api.request.duration']:
-            pred = self.predictive_analyzer.predict_trend(metric_name)
+        for metric_name in key_metrics:
+            pred = all_predictions[metric_name]
             if 'predicted_value' in pred:
                 predictions[metric_name] = pred
 
         # Get anomalies
-        anomalies = {}
-        for metric_name in metrics.keys():
-            metric_anomalies = self.predictive_analyzer.detect_anomalies(metric_name)
-            if metric_anomalies:
-                anomalies[metric_name] = metric_anomalies
+        anomalies = {name: found for name, found in all_anomalies.items() if found}
 
-        # Get recommendations
-        recommendations = []
+        # Get value distributions
+        distributions = {}
         for metric_name in metrics.keys():
-            recs = self.predictive_analyzer.get_recommendations(metric_name)
-            recommendations.extend(recs)
+            distribution = self.predictive_analyzer.get_distribution(metric_name)
+            if distribution:
+                distributions[metric_name] = distribution
+
+        # Get recommendations, de-duplicated in first-seen order
+        recommendations: Dict[str, None] = {}
+        for metric_name in metrics:
+            recs = analyzer.get_recommendations(
+                metric_name, all_predictions[metric_name], all_anomalies[metric_name]
+            )
+            recommendations.update(dict.fromkeys(recs))
 
         # Get system health
         system_health = await self.get_system_health()
 
         return {
-            'timestamp': datetime.utcnow(),
+            'timestamp': datetime.now(timezone.utc),
             'metrics': metrics,
-            'active_alerts': [self._alert_to_dict(alert) for alert in active_alerts],
+            'active_alerts': active_alerts,
             'predictions': predictions,
             'anomalies': anomalies,
-            'recommendations': list(set(recommendations)),  # Remove duplicates
-            'system_health': self._health_to_dict(system_health)
+            'distributions': distributions,
+            'recommendations': list(recommendations),
+            'system_health': system_health
         }
 
+    async def get_performance_report_json(self) -> bytes:
+        """Performance report serialised straight to JSON bytes
+
+        Alerts and system health are encoded from their dataclasses, with
+        timestamps as POSIX seconds.
+        """
+        return _dumps_report(await self._build_report())
+
     async def _monitoring_loop(self):
         """Main monitoring loop"""
         while self._monitoring_active:
             try:
+                self._publish_api_duration()
+                self._publish_api_error_rate()
+
                 # Check alerts
                 self.alert_system.check_alerts(self.metrics_collector)
 
-                # Update predictive analyzer with new data
-                for metric_name, metric_data in self.metrics_collector.get_all_metrics().items():
-                    if 'current' in metric_data:
-                        self.predictive_analyzer.add_data_point(
-                            metric_name,
-                            metric_data['current']
-                        )
+                # Update predictive analyzer with everything recorded since the last tick
+                snapshot = self.metrics_collector.snapshot(self._ingested_until)
+                if snapshot:
+                    self._ingested_until = max(timestamps[-1] for timestamps, _ in snapshot.values())
+                    self.predictive_analyzer.ingest(snapshot)
 
                 # Run health checks
                 for check_name, check_func in self.health_checks.items():
@@ -618,6 +1390,21 @@ class PerformanceMonitor:
                 print(f"Error in monitoring loop: {e}")
                 await asyncio.sleep(30)
 
+    def _alert_to_dict(self, alert: Alert) -> Dict[str, Any]:
+        """Convert alert to dictionary"""
+        data = asdict(alert)
+        data['severity'] = alert.severity.value
+        data['timestamp'] = datetime.fromtimestamp(alert.timestamp, timezone.utc).isoformat()
+        if alert.resolved_at is not None:
+            data['resolved_at'] = datetime.fromtimestamp(alert.resolved_at, timezone.utc).isoformat()
+        return data
+
+    def _health_to_dict(self, health: SystemHealth) -> Dict[str, Any]:
+        """Convert health status to dictionary"""
+        data = asdict(health)
+        data['last_updated'] = datetime.fromtimestamp(health.last_updated, timezone.utc).isoformat()
+        return data
+
     def _setup_default_alerts(self):
         """Set up default alert rules"""
         self.alert_system.add_alert_rule(
@@ -640,43 +1427,13 @@ class PerformanceMonitor:
 
         self.alert_system.add_alert_rule(
             'high_error_rate',
-            'api.error.count',
+            'api.error.rate',
             5.0,
             'above',
             AlertSeverity.ERROR,
             'API error rate is above 5%'
         )
 
-    def _alert_to_dict(self, alert: Alert) -> Dict[str, Any]:
-        """Convert alert to dictionary"""
-        return {
-            'id': alert.id,
-            'name': alert.name,
-            'severity': alert.severity.value,
-            'message': alert.message,
-            'metric_name': alert.metric_name,
-            'threshold': alert.threshold,
-            'current_value': alert.current_value,
-            'condition': alert.condition,
-            'timestamp': alert.timestamp.isoformat(),
-            'resolved': alert.resolved
-        }
-
-    def _health_to_dict(self, health: SystemHealth) -> Dict[str, Any]:
-        """Convert health status to dictionary"""
-        return {
-            'overall_status': health.overall_status,
-            'cpu_usage': health.cpu_usage,
-            'memory_usage': health.memory_usage,
-            'disk_usage': health.disk_usage,
-            'network_io': health.network_io,
-            'active_connections': health.active_connections,
-            'response_time_avg': health.response_time_avg,
-            'error_rate': health.error_rate,
-            'uptime': health.uptime,
-            'last_updated': health.last_updated.isoformat()
-        }
-
 
 # Global performance monitor instance
 performance_monitor = PerformanceMonitor()
@@ -3,14 +3,27 @@ Premium Sanaa components - stub implementations for missing functionality
 """
 from __future__ import annotations
 import asyncio
+import json
+import os
 import time
 from typing import Optional, List, Dict, Any
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, fields, replace
+from functools import lru_cache
 from pathlib import Path
 import difflib
+import heapq
+
+try:  # Optional C++ backend for fuzzy matching
+    from rapidfuzz import fuzz, process, utils as fuzz_utils
+except ImportError:  # pragma: no cover - optional dependency
+    fuzz = process = fuzz_utils = None
+
+from rich.console import Console
 
 from .projects import Project, ProjectRegistry
 
+_console = Console()
+
 # -------------------------
 # Configuration
 # -------------------------
@@ -28,12 +41,41 @@ class SanaaConfig:
 
     @classmethod
     def load(cls) -> "SanaaConfig":
-        """Load configuration"""
-        return cls()
+        """Load configuration; every caller gets its own copy"""
+        path = _config_path()
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        return replace(_read_config(cls, path, mtime_ns))
 
     def save(self):
-        """Save configuration"""
-        pass
+        """Save configuration atomically"""
+        path = _config_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(self), indent=2))
+        os.replace(tmp_path, path)
+        _read_config.cache_clear()
+
+def _config_path() -> Path:
+    return Path.home() / ".sanaa" / "config.json"
+
+@lru_cache(maxsize=1)
+def _read_config(cls: type[SanaaConfig], path: Path, mtime_ns: Optional[int]) -> SanaaConfig:
+    """Parse the config file once per modification; never hand this out directly"""
+    config = cls()
+    if mtime_ns is None:
+        return config
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return config  # Fall back to defaults on an unreadable file
+    names = {f.name for f in fields(cls)}
+    for key, value in data.items():
+        if key in names:
+            setattr(config, key, value)
+    return config
 
 # -------------------------
 # Fuzzy Matching
@@ -47,6 +89,12 @@ class FuzzyMatcher:
         """Find the best fuzzy match"""
         if not candidates:
             return None
+        if query in candidates:
+            return query
+
+        if process is not None:
+            match = process.extractOne(query, candidates, scorer=fuzz.WRatio, score_cutoff=threshold * 100)
+            return match[0] if match else None
 
         matches = difflib.get_close_matches(query, candidates, n=1, cutoff=threshold)
         return matches[0] if matches else None
@@ -54,37 +102,83 @@ class FuzzyMatcher:
     @staticmethod
     def suggest_corrections(query: str, candidates: List[str], max_suggestions: int = 3) -> List[tuple[str, float]]:
         """Get multiple suggestions with confidence scores"""
+        # Matching is case-insensitive on both backends, and a name equal to
+        # the query scores 1.0 without fuzzy scoring
+        q = query.lower()
+        lowered = [candidate.lower() for candidate in candidates]
+        exact = [(c, 1.0) for c, lowered_c in zip(candidates, lowered) if lowered_c == q]
+        if len(exact) >= max_suggestions:
+            return exact[:max_suggestions]
+
+        if process is not None:
+            return [
+                (candidate, score / 100)
+                for candidate, score, _ in process.extract(
+                    query, candidates, scorer=fuzz.WRatio, processor=fuzz_utils.default_process,
+                    limit=max_suggestions, score_cutoff=40
+                )
+            ]
+
+        # Keep the query as the first sequence: ratio() is not symmetric, and
+        # scores must rank the same as SequenceMatcher(None, q, candidate)
+        matcher = difflib.SequenceMatcher(None, q, "")
+        query_len = len(q)
         suggestions = []
-        for candidate in candidates:
-            ratio = difflib.SequenceMatcher(None, query.lower(), candidate.lower()).ratio()
+        for candidate, lowered_candidate in zip(candidates, lowered):
+            if lowered_candidate == q:
+                suggestions.append((candidate, 1.0))
+                continue
+            # Length alone bounds the ratio at 2*min/(len_a+len_b)
+            candidate_len = len(lowered_candidate)
+            if 2 * min(query_len, candidate_len) <= 0.4 * (query_len + candidate_len):
+                continue
+            matcher.set_seq2(lowered_candidate)
+            if matcher.quick_ratio() <= 0.4:
+                continue
+            ratio = matcher.ratio()
             if ratio > 0.4:
                 suggestions.append((candidate, ratio))
 
-        return sorted(suggestions, key=lambda x: x[1], reverse=True)[:max_suggestions]
+        return heapq.nlargest(max_suggestions, suggestions, key=lambda x: x[1])
+
+    @staticmethod
+    def suggest_projects(query: str, registry: ProjectRegistry, max_suggestions: int = 3) -> List[tuple[str, float]]:
+        """Suggest project names, preferring prefix completions over fuzzy matches"""
+        index = registry.name_index()
+        completions = index.complete(query)
+        if completions:
+            # Shortest completions first; score by how much of the name was typed
+            return [(name, len(query) / len(name)) for name in completions[:max_suggestions]]
+        return FuzzyMatcher.suggest_corrections(query, index.names, max_suggestions)
 
 # -------------------------
 # Progress Tracking
 # -------------------------
 
+class _Status:
+    """Context manager that prints a status message on entry"""
+
+    __slots__ = ("message",)
+
+    def __init__(self, message: str):
+        self.message = message
+
+    def __enter__(self) -> "_Status":
+        print(f"[dim]{self.message}[/dim]")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        return False
+
 class SmartProgress:
     """Simple progress tracking"""
 
     def __init__(self):
         pass
 
-    def status_context(self, message: str):
+    def status_context(self, message: str) -> _Status:
         """Context manager for status messages"""
-        from contextlib import contextmanager
-
-        @contextmanager
-        def _status_context():
-            print(f"[dim]{message}[/dim]")
-            try:
-                yield
-            finally:
-                pass
-
-        return _status_context()
+        return _Status(message)
 
 # -------------------------
 # Premium Sanaa
@@ -99,13 +193,24 @@ class PremiumSanaa:
     def smart_project_selection(self, registry: ProjectRegistry, project: Optional[str] = None) -> Optional[Project]:
         """Smart project selection"""
         if project:
-            return registry.get(project)
+            found = registry.get(project)
+            if found is not None:
+                return found
+            # A prefix that completes to a single project is unambiguous
+            completions = registry.name_index().complete(project)
+            if len(completions) == 1:
+                return registry.get(completions[0])
+            suggestions = FuzzyMatcher.suggest_projects(project, registry)
+            if suggestions:
+                _console.print(f"[yellow]Project '{project}' not found. Did you mean:[/yellow]")
+                for name, _ in suggestions:
+                    _console.print(f"  • {name}")
+            return None
         return registry.get(registry.default) if registry.default else None
 
     async def smart_chat(self, project: Optional[Project], message: Optional[str] = None):
         """Smart chat functionality"""
-        from rich.console import Console
-        console = Console()
+        console = _console
 
         if not project:
             console.print("[yellow]No project selected. Use --project to specify a project.[/yellow]")
@@ -133,8 +238,7 @@ class SmartInteractiveMode:
     """Interactive mode for Sanaa"""
 
     def __init__(self):
-        from rich.console import Console
-        self.console = Console()
+        self.console = _console
         self.registry = ProjectRegistry.load()
 
     def _show_detailed_status(self):
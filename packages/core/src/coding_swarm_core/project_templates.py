@@ -2,14 +2,202 @@
 Project Templates - Framework-specific project templates and workflows
 """
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Final, List, Optional, Set, Tuple
 from pathlib import Path
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 import json
+import os
 
 from .projects import Project
 
 
+# -------------------------
+# Config file contents
+# -------------------------
+
+_VITE_CONFIG_REACT: Final[str] = """import { defineConfig } from 'vite'
+import react from '@vitejs/plugin-react'
+
+export default defineConfig({
+  plugins: [react()],
+})"""
+
+_TSCONFIG_REACT: Final[str] = """{
+  "compilerOptions": {
+    "target": "ES2020",
+    "useDefineForClassFields": true,
+    "lib": ["ES2020", "DOM", "DOM.Iterable"],
+    "module": "ESNext",
+    "skipLibCheck": true,
+    "moduleResolution": "bundler",
+    "allowImportingTsExtensions": true,
+    "resolveJsonModule": true,
+    "isolatedModules": true,
+    "noEmit": true,
+    "jsx": "react-jsx",
+    "strict": true,
+    "noUnusedLocals": true,
+    "noUnusedParameters": true,
+    "noFallthroughCasesInSwitch": true
+  },
+  "include": ["src"],
+  "references": [{ "path": "./tsconfig.node.json" }]
+}"""
+
+_TAILWIND_CONFIG: Final[str] = """/** @type {import('tailwindcss').Config} */
+module.exports = {
+  content: [
+    './src/pages/**/*.{js,ts,jsx,tsx,mdx}',
+    './src/components/**/*.{js,ts,jsx,tsx,mdx}',
+    './src/app/**/*.{js,ts,jsx,tsx,mdx}',
+  ],
+  theme: {
+    extend: {},
+  },
+  plugins: [],
+}"""
+
+_COMPOSER_JSON_LARAVEL_API: Final[str] = """{
+  "name": "laravel/laravel",
+  "type": "project",
+  "description": "Laravel API Application",
+  "require": {
+    "php": "^8.2",
+    "laravel/framework": "^11.0"
+  }
+}"""
+
+_ENV_EXAMPLE_LARAVEL: Final[str] = """APP_NAME=Laravel
+APP_ENV=local
+APP_KEY=
+APP_DEBUG=true
+APP_URL=http://localhost
+
+DB_CONNECTION=mysql
+DB_HOST=127.0.0.1
+DB_PORT=3306
+DB_DATABASE=laravel
+DB_USERNAME=root
+DB_PASSWORD=
+
+CACHE_DRIVER=file
+QUEUE_CONNECTION=sync"""
+
+_PACKAGE_JSON_LARAVEL: Final[str] = """{
+  "private": true,
+  "scripts": {
+    "build": "vite build",
+    "dev": "vite build --watch"
+  },
+  "devDependencies": {
+    "axios": "^1.6.0",
+    "laravel-vite-plugin": "^1.0.0",
+    "vite": "^5.0.0"
+  }
+}"""
+
+_VITE_CONFIG_LARAVEL: Final[str] = """import { defineConfig } from 'vite';
+import laravel from 'laravel-vite-plugin';
+
+export default defineConfig({
+    plugins: [
+        laravel({
+            input: 'resources/css/app.css',
+            refresh: true,
+        }),
+    ],
+});"""
+
+_ANALYSIS_OPTIONS_FLUTTER: Final[str] = """include: package:flutter_lints/analysis_options.yaml
+
+linter:
+  rules:
+    - prefer_const_constructors
+    - prefer_const_declarations
+    - avoid_print
+    - unnecessary_brace_in_string_interps"""
+
+_README_FLUTTER: Final[str] = """# Flutter App
+
+A new Flutter project.
+
+## Getting Started
+
+This project is a starting point for a Flutter application.
+
+A few resources to get you started if this is your first Flutter project:
+
+- [Lab: Write your first Flutter app](https://docs.flutter.dev/get-started/codelab)
+- [Cookbook: Useful Flutter samples](https://docs.flutter.dev/cookbook)
+
+For help getting started with Flutter development, view the
+[online documentation](https://docs.flutter.dev/), which offers tutorials,
+samples, guidance on mobile development, and a full API reference."""
+
+_FIREBASE_JSON: Final[str] = """{
+  "functions": {
+    "source": "functions"
+  },
+  "hosting": {
+    "public": "build/web",
+    "ignore": [
+      "firebase.json",
+      "**/.*",
+      "**/node_modules/**"
+    ],
+    "rewrites": [
+      {
+        "source": "**",
+        "destination": "/index.html"
+      }
+    ]
+  }
+}"""
+
+# Sections shared by the Flutter pubspec files
+_PUBSPEC_ENVIRONMENT: Final[str] = """environment:
+  sdk: '>=3.0.0 <4.0.0'"""
+
+_PUBSPEC_DEV_DEPENDENCIES: Final[str] = """dev_dependencies:
+  flutter_test:
+    sdk: flutter
+  flutter_lints: ^3.0.0"""
+
+_PUBSPEC_FLUTTER: Final[str] = f"""name: flutter_app
+description: A new Flutter project.
+version: 1.0.0+1
+
+{_PUBSPEC_ENVIRONMENT}
+
+dependencies:
+  flutter:
+    sdk: flutter
+  provider: ^6.0.5
+  http: ^1.1.0
+
+{_PUBSPEC_DEV_DEPENDENCIES}
+
+flutter:
+  uses-material-design: true"""
+
+_PUBSPEC_FLUTTER_FIREBASE: Final[str] = f"""name: flutter_firebase_app
+description: Flutter app with Firebase
+version: 1.0.0+1
+
+{_PUBSPEC_ENVIRONMENT}
+
+dependencies:
+  flutter:
+    sdk: flutter
+  firebase_core: ^2.24.2
+  firebase_auth: ^4.16.0
+  cloud_firestore: ^4.14.0
+  provider: ^6.0.5
+
+{_PUBSPEC_DEV_DEPENDENCIES}"""
+
+
 @dataclass
 class ProjectTemplate:
     """Template for creating new projects"""
@@ -27,8 +215,10 @@ class ProjectTemplate:
 class ProjectTemplateManager:
     """Manages project templates for different frameworks"""
 
-    def __init__(self):
-        self.templates = self._load_templates()
+    @cached_property
+    def templates(self) -> Dict[str, ProjectTemplate]:
+        """Available templates, built on first access"""
+        return self._load_templates()
 
     def _load_templates(self) -> Dict[str, ProjectTemplate]:
         """Load all available project templates"""
@@ -69,33 +259,8 @@ class ProjectTemplateManager:
                     "lint": "eslint src --ext ts,tsx --report-unused-disable-directives --max-warnings 0"
                 },
                 config_files={
-                    "vite.config.ts": """import { defineConfig } from 'vite'
-import react from '@vitejs/plugin-react'
-
-export default defineConfig({
-  plugins: [react()],
-})""",
-                    "tsconfig.json": """{
-  "compilerOptions": {
-    "target": "ES2020",
-    "useDefineForClassFields": true,
-    "lib": ["ES2020", "DOM", "DOM.Iterable"],
-    "module": "ESNext",
-    "skipLibCheck": true,
-    "moduleResolution": "bundler",
-    "allowImportingTsExtensions": true,
-    "resolveJsonModule": true,
-    "isolatedModules": true,
-    "noEmit": true,
-    "jsx": "react-jsx",
-    "strict": true,
-    "noUnusedLocals": true,
-    "noUnusedParameters": true,
-    "noFallthroughCasesInSwitch": true
-  },
-  "include": ["src"],
-  "references": [{ "path": "./tsconfig.node.json" }]
-}"""
+                    "vite.config.ts": _VITE_CONFIG_REACT,
+                    "tsconfig.json": _TSCONFIG_REACT
                 }
             ),
 
@@ -137,18 +302,7 @@ export default defineConfig({
                     "lint": "next lint"
                 },
                 config_files={
-                    "tailwind.config.js": """/** @type {import('tailwindcss').Config} */
-module.exports = {
-  content: [
-    './src/pages/**/*.{js,ts,jsx,tsx,mdx}',
-    './src/components/**/*.{js,ts,jsx,tsx,mdx}',
-    './src/app/**/*.{js,ts,jsx,tsx,mdx}',
-  ],
-  theme: {
-    extend: {},
-  },
-  plugins: [],
-}"""
+                    "tailwind.config.js": _TAILWIND_CONFIG
                 }
             ),
 
@@ -199,30 +353,8 @@ module.exports = {
                     "seed": "php artisan db:seed"
                 },
                 config_files={
-                    "composer.json": """{
-  "name": "laravel/laravel",
-  "type": "project",
-  "description": "Laravel API Application",
-  "require": {
-    "php": "^8.2",
-    "laravel/framework": "^11.0"
-  }
-}""",
-                    ".env.example": """APP_NAME=Laravel
-APP_ENV=local
-APP_KEY=
-APP_DEBUG=true
-APP_URL=http://localhost
-
-DB_CONNECTION=mysql
-DB_HOST=127.0.0.1
-DB_PORT=3306
-DB_DATABASE=laravel
-DB_USERNAME=root
-DB_PASSWORD=
-
-CACHE_DRIVER=file
-QUEUE_CONNECTION=sync"""
+                    "composer.json": _COMPOSER_JSON_LARAVEL_API,
+                    ".env.example": _ENV_EXAMPLE_LARAVEL
                 }
             ),
 
@@ -269,29 +401,8 @@ QUEUE_CONNECTION=sync"""
                     "dev": "npm run dev"
                 },
                 config_files={
-                    "package.json": """{
-  "private": true,
-  "scripts": {
-    "build": "vite build",
-    "dev": "vite build --watch"
-  },
-  "devDependencies": {
-    "axios": "^1.6.0",
-    "laravel-vite-plugin": "^1.0.0",
-    "vite": "^5.0.0"
-  }
-}""",
-                    "vite.config.js": """import { defineConfig } from 'vite';
-import laravel from 'laravel-vite-plugin';
-
-export default defineConfig({
-    plugins: [
-        laravel({
-            input: 'resources/css/app.css',
-            refresh: true,
-        }),
-    ],
-});"""
+                    "package.json": _PACKAGE_JSON_LARAVEL,
+                    "vite.config.js": _VITE_CONFIG_LARAVEL
                 }
             ),
 
@@ -329,50 +440,9 @@ export default defineConfig({
                     "test": "flutter test"
                 },
                 config_files={
-                    "pubspec.yaml": """name: flutter_app
-description: A new Flutter project.
-version: 1.0.0+1
-
-environment:
-  sdk: '>=3.0.0 <4.0.0'
-
-dependencies:
-  flutter:
-    sdk: flutter
-  provider: ^6.0.5
-  http: ^1.1.0
-
-dev_dependencies:
-  flutter_test:
-    sdk: flutter
-  flutter_lints: ^3.0.0
-
-flutter:
-  uses-material-design: true""",
-                    "analysis_options.yaml": """include: package:flutter_lints/analysis_options.yaml
-
-linter:
-  rules:
-    - prefer_const_constructors
-    - prefer_const_declarations
-    - avoid_print
-    - unnecessary_brace_in_string_interps""",
-                    "README.md": """# Flutter App
-
-A new Flutter project.
-
-## Getting Started
-
-This project is a starting point for a Flutter application.
-
-A few resources to get you started if this is your first Flutter project:
-
-- [Lab: Write your first Flutter app](https://docs.flutter.dev/get-started/codelab)
-- [Cookbook: Useful Flutter samples](https://docs.flutter.dev/cookbook)
-
-For help getting started with Flutter development, view the
-[online documentation](https://docs.flutter.dev/), which offers tutorials,
-samples, guidance on mobile development, and a full API reference."""
+                    "pubspec.yaml": _PUBSPEC_FLUTTER,
+                    "analysis_options.yaml": _ANALYSIS_OPTIONS_FLUTTER,
+                    "README.md": _README_FLUTTER
                 }
             ),
 
@@ -423,51 +493,22 @@ samples, guidance on mobile development, and a full API reference."""
                     "deploy-functions": "firebase deploy --only functions"
                 },
                 config_files={
-                    "pubspec.yaml": """name: flutter_firebase_app
-description: Flutter app with Firebase
-version: 1.0.0+1
-
-environment:
-  sdk: '>=3.0.0 <4.0.0'
-
-dependencies:
-  flutter:
-    sdk: flutter
-  firebase_core: ^2.24.2
-  firebase_auth: ^4.16.0
-  cloud_firestore: ^4.14.0
-  provider: ^6.0.5
-
-dev_dependencies:
-  flutter_test:
-    sdk: flutter
-  flutter_lints: ^3.0.0""",
-                    "firebase.json": """{
-  "functions": {
-    "source": "functions"
-  },
-  "hosting": {
-    "public": "build/web",
-    "ignore": [
-      "firebase.json",
-      "**/.*",
-      "**/node_modules/**"
-    ],
-    "rewrites": [
-      {
-        "source": "**",
-        "destination": "/index.html"
-      }
-    ]
-  }
-}"""
+                    "pubspec.yaml": _PUBSPEC_FLUTTER_FIREBASE,
+                    "firebase.json": _FIREBASE_JSON
                 }
             )
         }
 
+    @cached_property
+    def _by_framework(self) -> Dict[str, List[ProjectTemplate]]:
+        by_framework: Dict[str, List[ProjectTemplate]] = {}
+        for template in self.templates.values():
+            by_framework.setdefault(template.framework, []).append(template)
+        return by_framework
+
     def get_templates_by_framework(self, framework: str) -> List[ProjectTemplate]:
         """Get all templates for a specific framework"""
-        return [template for template in self.templates.values() if template.framework == framework]
+        return list(self._by_framework.get(framework, ()))
 
     def get_template(self, template_name: str) -> Optional[ProjectTemplate]:
         """Get a specific template by name"""
@@ -499,20 +540,16 @@ dev_dependencies:
         return project
 
     def _create_structure(self, base_path: Path, structure: Dict[str, Any], current_path: Path = None):
-        """Recursively create project structure"""
-        if current_path is None:
-            current_path = base_path
+        """Create project structure"""
+        dirs, files = _flatten(structure, current_path or base_path)
 
-        for name, content in structure.items():
-            item_path = current_path / name
+        # makedirs creates intermediate directories, so only leaves are needed
+        for directory in sorted(dirs):
+            os.makedirs(directory, exist_ok=True)
 
-            if isinstance(content, dict):
-                # It's a directory
-                item_path.mkdir(exist_ok=True)
-                self._create_structure(base_path, content, item_path)
-            else:
-                # It's a file with default content
-                item_path.write_text(content)
+        for file_path, content in files:
+            with open(file_path, "w") as f:
+                f.write(content)
 
     def _create_config_files(self, project_path: Path, config_files: Dict[str, str]):
         """Create configuration files"""
@@ -521,20 +558,43 @@ dev_dependencies:
             file_path.parent.mkdir(parents=True, exist_ok=True)
             file_path.write_text(content)
 
-    def list_available_templates(self) -> Dict[str, List[str]]:
-        """List all available templates grouped by framework"""
-        templates_by_framework = {}
+    @cached_property
+    def _available_templates(self) -> Dict[str, List[str]]:
+        return {
+            framework: [f"{template.name}: {template.description}" for template in templates]
+            for framework, templates in self._by_framework.items()
+        }
 
-        for template in self.templates.values():
-            if template.framework not in templates_by_framework:
-                templates_by_framework[template.framework] = []
+    def list_available_templates(self) -> Dict[str, List[str]]:
+        """List all available templates grouped by framework (shared; do not mutate)"""
+        return self._available_templates
+
+
+def _flatten(structure: Dict[str, Any], base: Path) -> Tuple[Set[Path], List[Tuple[Path, str]]]:
+    """Split a template structure into leaf directories and (path, content) files"""
+    dirs: Set[Path] = set()
+    files: List[Tuple[Path, str]] = []
+    stack = [(base, structure)]
+    while stack:
+        current, node = stack.pop()
+        has_subdirs = False
+        for name, content in node.items():
+            item_path = current / name
+            if isinstance(content, dict):
+                has_subdirs = True
+                stack.append((item_path, content))
+            else:
+                files.append((item_path, content))
+        if not has_subdirs and current != base:
+            dirs.add(current)
+    return dirs, files
 
-            templates_by_framework[template.framework].append(
-                f"{template.name}: {template.description}"
-            )
 
-        return templates_by_framework
+@lru_cache(maxsize=1)
+def get_template_manager() -> ProjectTemplateManager:
+    """Get the shared template manager"""
+    return ProjectTemplateManager()
 
 
-# Global template manager instance
-template_manager = ProjectTemplateManager()
\ No newline at end of file
+# Global template manager instance; templates are only built when first used
+template_manager = get_template_manager()
\ No newline at end of file
@@ -61,13 +61,66 @@ class Project:
         if self.updated_at is None:
             self.updated_at = time.time()
 
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+class _TrieIndex:
+    """Case-insensitive prefix index over project names"""
+
+    __slots__ = ("_root", "_names")
+
+    # Key under which a node stores the original names ending there; it
+    # cannot clash with a child edge because edges are single characters.
+    _END = ""
+
+    def __init__(self, names: List[str]):
+        self._root: dict = {}
+        self._names = list(names)
+        for name in self._names:
+            node = self._root
+            for char in name.lower():
+                node = node.setdefault(char, {})
+            node.setdefault(self._END, []).append(name)
+
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    def complete(self, prefix: str) -> List[str]:
+        """Return every indexed name starting with prefix, shortest first"""
+        node = self._root
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+
+        matches = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == self._END:
+                    matches.extend(child)
+                else:
+                    stack.append(child)
+        matches.sort(key=len)
+        return matches
+
 class ProjectRegistry:
     """Manages project metadata and indexing"""
 
+    # (data file, mtime_ns, registry) from the last load(); reused while
+    # the file on disk is unchanged
+    _cached: Optional[tuple[Path, Optional[int], "ProjectRegistry"]] = None
+
     def __init__(self):
         self.projects: dict[str, Project] = {}
         self.default: Optional[str] = None
         self._data_file = Path.home() / ".sanaa" / "projects.json"
+        self._name_index: Optional[_TrieIndex] = None
         self._load()
 
     def _load(self):
@@ -113,10 +166,23 @@ class ProjectRegistry:
 
         self._data_file.write_text(json.dumps(data, indent=2))
 
+        # Our own write shouldn't make load() re-read the file
+        cached = ProjectRegistry._cached
+        if cached is not None and cached[2] is self:
+            ProjectRegistry._cached = (self._data_file, _mtime_ns(self._data_file), self)
+
     @classmethod
     def load(cls) -> "ProjectRegistry":
-        """Load project registry"""
-        return cls()
+        """Load project registry, reusing the last one if the file is unchanged"""
+        data_file = Path.home() / ".sanaa" / "projects.json"
+        mtime_ns = _mtime_ns(data_file)
+        cached = cls._cached
+        if cached is not None and cached[0] == data_file and cached[1] == mtime_ns and type(cached[2]) is cls:
+            return cached[2]
+
+        registry = cls()
+        ProjectRegistry._cached = (data_file, mtime_ns, registry)
+        return registry
 
     def list(self) -> List[Project]:
         """List all projects"""
@@ -126,15 +192,23 @@ class ProjectRegistry:
         """Get project by name"""
         return self.projects.get(name)
 
+    def name_index(self) -> _TrieIndex:
+        """Prefix index of project names, rebuilt after the registry changes"""
+        if self._name_index is None:
+            self._name_index = _TrieIndex(list(self.projects))
+        return self._name_index
+
     def add(self, project: Project):
         """Add a project"""
         self.projects[project.name] = project
+        self._name_index = None
         self._save()
 
     def remove(self, name: str):
         """Remove a project"""
         if name in self.projects:
             del self.projects[name]
+            self._name_index = None
             if self.default == name:
                 self.default = None
             self._save()
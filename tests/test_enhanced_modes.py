@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from coding_swarm_core.enhanced_modes import ArchitectMode, CustomModeManager, ModeConfig, _scandir_files, _WalkLimitReached
+
+
+def test_json_mode_wins_over_legacy_yaml(tmp_path):
+    json_mode = {"name": "review", "description": "hand written", "system_prompt": "json"}
+    (tmp_path / "review.json").write_text(json.dumps(json_mode))
+    yaml_file = tmp_path / "review.yaml"
+    yaml_file.write_text("name: review\ndescription: legacy\nsystem_prompt: yaml\n")
+    # The legacy YAML is the newer of the two files
+    os.utime(tmp_path / "review.json", ns=(1, 1))
+
+    manager = CustomModeManager(modes_dir=tmp_path)
+
+    assert json.loads((tmp_path / "review.json").read_text()) == json_mode
+    assert manager.custom_modes["review"].system_prompt == "json"
+
+    # A saved update to the mode survives a reload
+    manager.create_custom_mode(ModeConfig(name="review", description="new", system_prompt="json"))
+    assert CustomModeManager(modes_dir=tmp_path).custom_modes["review"].description == "new"
+
+
+def test_yaml_only_modes_load_through_a_separate_bake(tmp_path):
+    (tmp_path / "lint.yaml").write_text("name: lint\ndescription: legacy\nsystem_prompt: yaml\n")
+
+    assert CustomModeManager(modes_dir=tmp_path).custom_modes["lint"].system_prompt == "yaml"
+    bake = tmp_path / ".cache" / "lint.yaml.json"
+    assert json.loads(bake.read_text())["description"] == "legacy"
+    assert not (tmp_path / "lint.json").exists()
+
+    # A later load reads the cached bake
+    assert CustomModeManager(modes_dir=tmp_path).custom_modes["lint"].description == "legacy"
+
+
+def test_scandir_files_yields_nothing_for_unlistable_root(tmp_path):
+    assert list(_scandir_files(tmp_path / "missing")) == []
+    (tmp_path / "file.txt").write_text("")
+    assert list(_scandir_files(tmp_path / "file.txt")) == []
+
+
+def test_scandir_files_prunes_and_limits(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text("")
+    assert [entry.name for entry in _scandir_files(tmp_path)] == ["app.py"]
+
+    (tmp_path / "src" / "util.py").write_text("")
+    with pytest.raises(_WalkLimitReached):
+        list(_scandir_files(tmp_path, max_entries=1))
+
+
+def test_handlers_and_suggest_mode_share_keyword_matching(tmp_path):
+    manager = CustomModeManager(modes_dir=tmp_path)
+    architect = manager.get_mode_handler("architect")
+    debugger = manager.get_mode_handler("debugger")
+
+    assert architect.can_handle_request("Plan the rollout", {})
+    assert not architect.can_handle_request("Visit the planet", {})
+    assert debugger.can_handle_request("login is NOT WORKING", {})
+
+    assert manager.suggest_mode("Plan the rollout", {}) == "architect"
+    assert manager.suggest_mode("login is not working", {}) == "debugger"
+    assert manager.suggest_mode("visit the planet", {}) == "coder"
+
+
+def test_project_scan_of_a_non_directory_is_empty(tmp_path):
+    (tmp_path / "package.json").write_text("{}")
+    architect = ArchitectMode()
+
+    assert architect._scan_project(tmp_path)["technologies"] == ["Node.js"]
+    for path in (tmp_path / "package.json", tmp_path / "missing"):
+        analysis = architect._scan_project(path)
+        assert analysis["structure"] == {}
+        assert analysis["technologies"] == []
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+
+import pytest
+
+import coding_swarm_core.mcp_integration as mcp
+from coding_swarm_core.mcp_integration import MCPServer, MCPTransport, MCPTransportPool, STDIOTransport
+
+# Minimal newline-framed MCP server: answers every request with an empty
+# result, except "echo_size", whose result carries params["size"] bytes, and
+# "slow", which answers after a second. Batches (array messages) and "hang"
+# requests are ignored without a reply.
+FAKE_SERVER = r"""
+import json, sys, time
+for line in sys.stdin:
+    message = json.loads(line)
+    if not isinstance(message, dict) or "id" not in message or message["method"] == "hang":
+        continue
+    if message["method"] == "slow":
+        time.sleep(1.0)
+    result = {}
+    if message["method"] == "echo_size":
+        result = {"data": "x" * message["params"]["size"]}
+    sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\n")
+    sys.stdout.flush()
+"""
+
+
+def fake_server(script: str = FAKE_SERVER, **kwargs) -> MCPServer:
+    return MCPServer(name="fake", command=(sys.executable, "-c", script), log_stderr=False, **kwargs)
+
+
+def test_stdio_transport_reads_replies_over_64k():
+    async def run():
+        transport = STDIOTransport(fake_server())
+        await transport.start()
+        try:
+            response = await asyncio.wait_for(
+                transport.send_request("echo_size", {"size": 100_000}), timeout=10
+            )
+            assert len(response["result"]["data"]) == 100_000
+            assert transport.is_alive
+        finally:
+            await transport.stop()
+
+    asyncio.run(run())
+
+
+def test_stdio_transport_fails_fast_after_oversized_reply(monkeypatch):
+    monkeypatch.setattr(mcp, "_STREAM_LIMIT", 4096)
+
+    async def run():
+        transport = STDIOTransport(fake_server())
+        await transport.start()
+        try:
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(
+                    transport.send_request("echo_size", {"size": 100_000}), timeout=10
+                )
+            await asyncio.sleep(0)
+            assert not transport.is_alive
+            # A dead reader must not leave the next request waiting forever
+            with pytest.raises(RuntimeError, match="connection closed"):
+                await asyncio.wait_for(transport.send_request("ping", {}), timeout=1)
+        finally:
+            await transport.stop()
+
+    asyncio.run(run())
+
+
+def test_registry_write_survives_loop_shutdown(tmp_path):
+    config_path = tmp_path / "mcp-servers.json"
+
+    async def add():
+        registry = mcp.MCPRegistry(config_path)
+        registry.add_custom_server(MCPServer(name="custom", command=("true",)))
+
+    # The loop ends before the debounce delay elapses
+    asyncio.run(add())
+
+    reloaded = mcp.MCPRegistry(config_path)
+    assert reloaded.get_server("custom") == MCPServer(name="custom", command=("true",))
+
+
+def test_registry_flush_writes_pending_changes(tmp_path):
+    config_path = tmp_path / "mcp-servers.json"
+
+    async def add_and_flush():
+        registry = mcp.MCPRegistry(config_path)
+        registry.add_custom_server(MCPServer(name="one"))
+        registry.add_custom_server(MCPServer(name="two"))
+        await registry.flush()
+        assert config_path.exists()
+
+    asyncio.run(add_and_flush())
+    assert set(mcp.MCPRegistry(config_path).custom_servers) == {"one", "two"}
+
+
+# FAKE_SERVER never answers array messages; this one also lists a tool
+TOOL_SERVER = FAKE_SERVER.replace(
+    'result = {}',
+    'result = {"tools": [{"name": "echo"}]} if message["method"] == "tools/list" else {}'
+)
+
+
+def test_discovery_pipelines_requests_by_default():
+    async def run():
+        client = mcp.MCPClient()
+        # Well inside the handshake timeout: no batch is sent and waited on
+        await asyncio.wait_for(client.add_server(fake_server(TOOL_SERVER)), timeout=5)
+        try:
+            assert client.list_tool_names() == ["fake:echo"]
+        finally:
+            await client.shutdown()
+
+    asyncio.run(run())
+
+
+def test_discovery_falls_back_when_batches_are_ignored(monkeypatch):
+    monkeypatch.setattr(mcp, "_HANDSHAKE_TIMEOUT", 2.0)
+
+    async def run():
+        client = mcp.MCPClient()
+        await asyncio.wait_for(client.add_server(fake_server(TOOL_SERVER, batching=True)), timeout=10)
+        try:
+            assert client.list_tool_names() == ["fake:echo"]
+        finally:
+            await client.shutdown()
+
+    asyncio.run(run())
+
+
+def test_requests_are_not_bound_by_the_handshake_timeout(monkeypatch):
+    monkeypatch.setattr(mcp, "_HANDSHAKE_TIMEOUT", 0.5)
+
+    async def run():
+        transport = STDIOTransport(fake_server())
+        await transport.start()
+        try:
+            # A long tools/call-style request outlives the handshake bound
+            assert "result" in await asyncio.wait_for(transport.send_request("slow", {}), timeout=10)
+        finally:
+            await transport.stop()
+
+    asyncio.run(run())
+
+
+def test_timed_out_request_is_unregistered():
+    async def run():
+        transport = STDIOTransport(fake_server(timeout=0.2))
+        await transport.start()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await transport.send_request("hang", {})
+            assert transport._pending == {}
+            # The transport is still usable afterwards
+            assert "result" in await transport.send_request("ping", {})
+        finally:
+            await transport.stop()
+
+    asyncio.run(run())
+
+
+def test_server_requests_do_not_resolve_client_requests():
+    async def run():
+        transport = STDIOTransport(fake_server())
+        future = asyncio.get_running_loop().create_future()
+        transport._pending[1] = future
+        transport._dispatch({"jsonrpc": "2.0", "id": 1, "method": "sampling/createMessage", "params": {}})
+        assert not future.done()
+        transport._dispatch({"jsonrpc": "2.0", "id": 1, "result": {}})
+        assert future.result() == {"jsonrpc": "2.0", "id": 1, "result": {}}
+
+    asyncio.run(run())
+
+
+class CountingTransport(MCPTransport):
+    started = 0
+
+    def __init__(self, server):
+        self.server = server
+
+    async def start(self):
+        CountingTransport.started += 1
+
+    async def stop(self):
+        pass
+
+    async def send_request(self, method, params):
+        return {"result": {}}
+
+
+def test_pool_shares_transports_until_inflight_limit():
+    async def hold(pool, release):
+        async with pool.acquire():
+            await release.wait()
+
+    async def run(callers):
+        CountingTransport.started = 0
+        pool = MCPTransportPool(MCPServer(name="fake"), min_size=1, max_size=4,
+                                factory=CountingTransport, health_interval=None, max_inflight=4)
+        await pool.start()
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(pool, release)) for _ in range(callers)]
+        await asyncio.sleep(0.01)
+        size = pool.size
+        release.set()
+        await asyncio.gather(*tasks)
+        await pool.close()
+        return size, CountingTransport.started
+
+    assert asyncio.run(run(3)) == (1, 1)
+    assert asyncio.run(run(10)) == (3, 3)
+    # Beyond max_size transports are shared past the in-flight limit
+    assert asyncio.run(run(40)) == (4, 4)
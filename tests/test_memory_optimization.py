@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime
+
+import coding_swarm_core.memory_optimization as memopt
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_queue_logging_is_shared_and_reference_counted():
+    parent = logging.getLogger("coding_swarm_core")
+    handler = ListHandler()
+    parent.addHandler(handler)
+    propagate = memopt.logger.propagate
+    first, second = object.__new__(memopt.MemoryOptimizer), object.__new__(memopt.MemoryOptimizer)
+    first._queue_logging = second._queue_logging = False
+    try:
+        first._start_queue_logging()
+        second._start_queue_logging()
+        second._start_queue_logging()  # Idempotent per optimizer
+        assert memopt._log_users == 2
+        memopt.logger.warning("both %s", "running")
+
+        second._stop_queue_logging()
+        second._stop_queue_logging()
+        assert memopt.logger.propagate == propagate
+        memopt.logger.warning("one running")
+
+        first._stop_queue_logging()
+        assert memopt._log_listener is None
+        memopt.logger.warning("none running")
+    finally:
+        parent.removeHandler(handler)
+
+    # Every record reaches the parent's handler exactly once
+    assert handler.messages == ["both running", "one running", "none running"]
+    assert memopt.logger.filters == []
+
+
+def test_resources_on_the_same_stripe_do_not_block_each_other(monkeypatch):
+    monkeypatch.setattr(memopt, "_LOCK_STRIPES", 1)
+    manager = memopt.ResourceManager()
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold(resource_id):
+        with manager.acquire_resource(resource_id):
+            entered.set()
+            release.wait(5)
+
+    worker = threading.Thread(target=hold, args=("a",))
+    worker.start()
+    try:
+        assert entered.wait(5)
+        # "b" shares the only stripe with "a", which is held by another thread
+        acquired = threading.Event()
+
+        def use_b():
+            with manager.acquire_resource("b"):
+                acquired.set()
+
+        other = threading.Thread(target=use_b, daemon=True)
+        other.start()
+        assert acquired.wait(2)
+    finally:
+        release.set()
+        worker.join()
+
+
+def test_resource_lock_is_reentrant_and_shared_per_id():
+    manager = memopt.ResourceManager()
+    with manager.acquire_resource("a") as outer:
+        with manager.acquire_resource("a") as inner:
+            assert inner == outer
+        assert manager._resource_lock("a") is manager._resource_lock("a")
+    assert manager._resource_lock("a") is not manager._resource_lock("b")
+
+
+def test_memory_pool_ring_is_fifo_and_bounded():
+    pool = memopt.MemoryPool(max_size=2)
+    for obj in ("a", "b", "c"):
+        pool.put("str", obj)
+
+    assert pool.get("str") == "a"
+    pool.put("str", "d")
+    assert [pool.get("str"), pool.get("str"), pool.get("str")] == ["b", "d", None]
+    assert pool.get_stats() == {"total_objects": 0, "pool_sizes": {"str": 0}, "usage_stats": {"str": 3}}
+
+
+def test_specialized_pool_matches_the_generic_pool():
+    pool_cls = memopt.MemoryPool.register_type("buffer")
+    assert memopt.MemoryPool.register_type("buffer") is pool_cls
+    pool = pool_cls(max_size=2)
+    for obj_type, obj in (("buffer", 1), ("buffer", 2), ("buffer", 3), ("other", "x")):
+        pool.put(obj_type, obj)
+
+    assert pool.get_stats()["pool_sizes"] == {"other": 1, "buffer": 2}
+    assert [pool.get("buffer"), pool.get("buffer"), pool.get("buffer")] == [1, 2, None]
+    assert pool.get("other") == "x"
+    stats = pool.get_stats()
+    assert stats["total_objects"] == 0
+    assert stats["usage_stats"] == {"other": 1, "buffer": 2}
+
+
+def test_memory_report_keeps_the_latest_sampled_allocations():
+    profiler = memopt.MemoryProfiler()
+    profiler.start_profiling()
+    try:
+        profiler.sample_every = 3
+        for _ in range(5):
+            profiler.take_snapshot()
+    finally:
+        profiler.stop_profiling()
+
+    # Only the first and fourth snapshots were sampled
+    assert [bool(s.top_allocations) for s in profiler.snapshots] == [True, False, False, True, False]
+    report = profiler.get_memory_report()
+    assert report.top_allocations == profiler.snapshots[3].top_allocations
+
+
+def test_max_snapshots_can_be_changed_after_construction():
+    profiler = memopt.MemoryProfiler()
+    for rss in (5, 9, 3, 4, 2):
+        profiler._append_snapshot(memopt.MemorySnapshot(datetime.utcnow(), rss, 0, 0.0))
+
+    profiler.max_snapshots = 3
+    assert [s.process_memory for s in profiler.snapshots] == [3, 4, 2]
+    assert (profiler._sum_memory, profiler._peak_queue[0][1]) == (9, 4)
+
+    profiler.max_snapshots = 4
+    profiler._append_snapshot(memopt.MemorySnapshot(datetime.utcnow(), 1, 0, 0.0))
+    assert [s.process_memory for s in profiler.snapshots] == [3, 4, 2, 1]
+    assert profiler.max_snapshots == 4
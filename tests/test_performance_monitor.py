@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+
+import pytest
+
+import coding_swarm_core.performance_monitor as pm
+from coding_swarm_core.performance_monitor import AlertSeverity, PerformanceMonitor
+
+
+def _monitor_with_alert() -> PerformanceMonitor:
+    monitor = PerformanceMonitor()
+    monitor.alert_system.add_alert_rule(
+        "high_cpu_usage", "system.cpu.usage", 80.0, "above", AlertSeverity.WARNING, "CPU usage is above 80%"
+    )
+    monitor.metrics_collector.record_metric("system.cpu.usage", 99.0)
+    monitor.alert_system.check_alerts(monitor.metrics_collector)
+    return monitor
+
+
+def test_performance_report_alerts_and_health_are_dicts():
+    report = asyncio.run(_monitor_with_alert().get_performance_report())
+
+    alert = report["active_alerts"][0]
+    assert alert["severity"] == "warning"
+    assert alert["metric_name"] == "system.cpu.usage"
+    assert isinstance(alert["timestamp"], str)
+    assert report["system_health"]["overall_status"] in {"healthy", "degraded", "unhealthy"}
+    assert isinstance(report["system_health"]["last_updated"], str)
+
+
+def test_performance_report_json_round_trips():
+    report = json.loads(asyncio.run(_monitor_with_alert().get_performance_report_json()))
+
+    assert report["active_alerts"][0]["severity"] == "warning"
+    assert "overall_status" in report["system_health"]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_ring_series_wraps_and_windows_oldest_first(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(pm, "np", None)
+    series = pm._RingSeries(4)
+    evicted = [series.append(float(i), 100.0 + i) for i in range(6)]
+
+    assert evicted == [None, None, None, None, 0.0, 1.0]
+    assert list(series.window(0)) == [2.0, 3.0, 4.0, 5.0]
+    assert list(series.window(103.5)) == [4.0, 5.0]
+    timestamps, values = series.columns_since(102)
+    assert list(timestamps) == [103.0, 104.0, 105.0]
+    assert list(values) == [3.0, 4.0, 5.0]
+    assert series.oldest_timestamp() == 102.0
+    assert series.latest_timestamp() == 105.0
+
+
+def test_aggregates_track_only_retained_samples(monkeypatch):
+    monkeypatch.setattr(pm, "_SERIES_CAPACITY", 5)
+    collector = pm.MetricsCollector()
+    samples = [3.0, 9.0, 1.0, 4.0, 7.0, 2.0, 8.0, 5.0]
+    for value in samples:
+        collector.record_metric("latency", value)
+
+    retained = samples[-5:]
+    aggregates = collector.get_aggregates("latency")
+    mean = sum(retained) / len(retained)
+    assert aggregates["count"] == 5
+    assert aggregates["sum"] == pytest.approx(sum(retained))
+    # 9.0 and 1.0 were evicted, so the extremes are recomputed
+    assert (aggregates["min"], aggregates["max"]) == (2.0, 8.0)
+    assert aggregates["stddev"] == pytest.approx(
+        math.sqrt(sum((v - mean) ** 2 for v in retained) / len(retained))
+    )
+    assert collector.get_metric("latency")["current"] == 5.0
+
+
+@pytest.mark.parametrize("rebuild_every", [4096, 3])
+def test_trend_regression_matches_a_full_fit_over_the_window(monkeypatch, rebuild_every):
+    monkeypatch.setattr(pm, "_HISTORY_WINDOW", 20)
+    monkeypatch.setattr(pm, "_REGRESSION_REBUILD_EVERY", rebuild_every)
+    analyzer = pm.PredictiveAnalyzer()
+    start = time.time() - 3600.0  # Inside the 24 hour horizon
+    for i in range(50):
+        # Older points follow a different line, and must stop counting once pruned
+        value = 5.0 * i if i < 30 else 100.0 + 2.0 * i + (i % 3)
+        analyzer.add_data_point("queue.depth", value, start + 60.0 * i)
+
+    timestamps, values = analyzer.historical_data["queue.depth"]
+    assert len(values) == 20
+    xs = [(t - timestamps[0]) / 3600 for t in timestamps]
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(values) / n
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, values)) / sum((x - mean_x) ** 2 for x in xs)
+
+    trend = analyzer.predict_trend("queue.depth")
+    assert trend["slope"] == pytest.approx(slope)
+    assert trend["trend"] == "increasing"
+
+
+def test_alert_history_ring_keeps_the_latest_resolutions(monkeypatch):
+    monkeypatch.setattr(pm, "_ALERT_HISTORY_SIZE", 3)
+    collector = pm.MetricsCollector()
+    alerts = pm.AlertSystem()
+    alerts.add_alert_rule("hot", "temp", 50.0, "above", AlertSeverity.CRITICAL, "Too hot")
+    for value in (60.0, 10.0, 61.0, 11.0, 62.0, 12.0, 63.0, 13.0):
+        collector.record_metric("temp", value)
+        alerts.check_alerts(collector)
+
+    history = alerts.get_alert_history()
+    assert [alert.current_value for alert in history] == [61.0, 62.0, 63.0]
+    assert all(alert.resolved and alert.severity is AlertSeverity.CRITICAL for alert in history)
+    assert history[-1].message == "Too hot - Current: 63.00, Threshold: 50.00"
+    assert [alert.current_value for alert in alerts.get_alert_history(limit=1)] == [63.0]
+
+
+@pytest.mark.skipif(not pm._ProcReader.available(), reason="needs Linux /proc")
+def test_proc_reader_reports_every_system_metric():
+    reader = pm._ProcReader()
+    try:
+        readings = {name: (value, unit) for name, value, unit in reader.read()}
+    finally:
+        reader.close()
+
+    assert len(readings) == 8
+    for name in ("system.cpu.usage", "system.memory.usage", "system.disk.usage", "process.cpu.usage"):
+        assert readings[name][1] == "percent"
+        assert readings[name][0] >= 0.0
+    assert 0.0 < readings["system.memory.usage"][0] <= 100.0
+    assert readings["process.memory.rss"][0] > 0.0
+
+
+def test_error_rate_alert_uses_a_percentage_and_resolves():
+    monitor = PerformanceMonitor()
+    monitor._setup_default_alerts()
+
+    def tick(successes, errors):
+        for _ in range(successes):
+            monitor.record_api_request("/ok", 0.01, 200)
+        for _ in range(errors):
+            monitor.record_api_request("/fail", 0.01, 500)
+        monitor._publish_api_error_rate()
+        monitor.alert_system.check_alerts(monitor.metrics_collector)
+        return [alert.name for alert in monitor.alert_system.get_active_alerts()]
+
+    # 6 errors in 1000 requests is 0.6%
+    assert tick(994, 6) == []
+    assert tick(0, 100) == ["high_error_rate"]
+    assert tick(2000, 0) == []
+    health = asyncio.run(monitor.get_system_health())
+    assert health.error_rate == pytest.approx(106 / 3100 * 100)
+
+
+def test_distribution_survives_an_aged_out_window(monkeypatch):
+    monkeypatch.setattr(pm, "TDigest", None)
+    analyzer = pm.PredictiveAnalyzer()
+    analyzer.add_data_point("m", 1.0, timestamp=time.time() - 25 * 3600)
+
+    distribution = analyzer.get_distribution("m")
+    assert distribution["count"] == 1
+    assert distribution["mean"] == 1.0
+    assert (distribution["p50"], distribution["p95"], distribution["p99"]) == (None, None, None)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+
+import difflib
+
+import pytest
+
+import coding_swarm_core.premium as premium
+from coding_swarm_core.premium import FuzzyMatcher, PremiumSanaa, SanaaConfig
+from coding_swarm_core.projects import Project, ProjectRegistry
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return tmp_path
+
+
+def test_sanaa_config_save_load_round_trip(home):
+    config = SanaaConfig.load()
+    assert config == SanaaConfig()
+
+    config.model_name = "custom-model"
+    config.max_context_files = 25
+    config.save()
+
+    loaded = SanaaConfig.load()
+    assert loaded.model_name == "custom-model"
+    assert loaded.max_context_files == 25
+    saved = json.loads((home / ".sanaa" / "config.json").read_text())
+    assert saved["model_name"] == "custom-model"
+
+
+def test_sanaa_config_load_returns_independent_copies(home):
+    first = SanaaConfig.load()
+    first.model_name = "unsaved"
+    assert SanaaConfig.load().model_name == SanaaConfig().model_name
+
+
+def test_sanaa_config_picks_up_external_edits(home):
+    SanaaConfig.load()
+    path = home / ".sanaa" / "config.json"
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"cache_ttl": 42, "unknown_key": 1}))
+    assert SanaaConfig.load().cache_ttl == 42
+
+
+def test_suggest_corrections_is_case_insensitive():
+    suggestions = FuzzyMatcher.suggest_corrections("build", ["Build", "guild", "deploy"])
+    assert suggestions[0] == ("Build", 1.0)
+    assert "deploy" not in [name for name, _ in suggestions]
+
+
+def test_suggest_corrections_exact_matches_short_circuit():
+    assert FuzzyMatcher.suggest_corrections("api", ["API", "apx", "Api"], max_suggestions=2) == [
+        ("API", 1.0),
+        ("Api", 1.0),
+    ]
+
+
+def test_difflib_scores_keep_the_query_as_first_sequence(monkeypatch):
+    monkeypatch.setattr(premium, "process", None)
+    # ratio() is asymmetric: 0.46 with the query first, 0.31 the other way
+    query, candidate = "dbbcacb", "cbccaa"
+    expected = difflib.SequenceMatcher(None, query, candidate).ratio()
+    assert FuzzyMatcher.suggest_corrections(query, [candidate]) == [(candidate, expected)]
+
+
+def test_project_selection_completes_unique_prefixes(home):
+    registry = ProjectRegistry.load()
+    for name in ("WebApp", "web-api", "backend"):
+        registry.add(Project(name=name, path=str(home)))
+    sanaa = PremiumSanaa()
+
+    assert sanaa.smart_project_selection(registry, "back").name == "backend"
+    # Ambiguous prefixes and typos are suggested, not guessed
+    assert sanaa.smart_project_selection(registry, "web") is None
+    assert FuzzyMatcher.suggest_projects("web", registry) == [("WebApp", 0.5), ("web-api", 3 / 7)]
+    assert FuzzyMatcher.suggest_projects("bakend", registry)[0][0] == "backend"
+
+    registry.remove("backend")
+    assert FuzzyMatcher.suggest_projects("back", registry) == []